@@ -0,0 +1,27 @@
+import time
+
+from text_to_timeline.maps import load_predicate_map
+from text_to_timeline.timeline_construction.allen_reasoner import AllenNetwork
+
+from timeline_engines import PREFIX, synthetic_event_seq
+
+
+def time_path_consistency(event_seq:list, temporal_predicates_map:dict) -> tuple:
+    t0 = time.perf_counter()
+    network = AllenNetwork.from_event_seq(event_seq, temporal_predicates_map, PREFIX)
+    consistent = network.path_consistency()
+    return time.perf_counter() - t0, consistent
+
+
+if __name__ == "__main__":
+    temporal_predicates_map = load_predicate_map()
+    print(f"{'events':>8} {'random (s)':>11} {'chain (s)':>10}")
+    for n_events in [500, 1_000, 2_000]:
+        random_time, _ = time_path_consistency(
+            synthetic_event_seq(n_events, 2 * n_events),
+            temporal_predicates_map
+        )
+        # a single chain of "before" relations closes into a dense network, the worst case
+        chain = [[f"event_{i}", f"{PREFIX}before", f"event_{i + 1}"] for i in range(n_events - 1)]
+        chain_time, _ = time_path_consistency(chain, temporal_predicates_map)
+        print(f"{n_events:>8} {random_time:>11.2f} {chain_time:>10.2f}")
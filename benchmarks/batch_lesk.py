@@ -0,0 +1,44 @@
+import random
+import time
+
+from nltk.corpus import wordnet as wn
+from nltk.wsd import lesk
+
+from text_to_timeline.kg_construction.batch_lesk import BatchLesk
+
+# Needs the WordNet corpus: python -m nltk.downloader wordnet
+
+
+def random_queries(n_queries:int, seed:int=0) -> list:
+    """
+    (context, word, pos) queries over random WordNet lemmas, with contexts made of other glosses.
+    """
+    rnd = random.Random(seed)
+    synsets = list(wn.all_synsets())
+    queries = list()
+    for _ in range(n_queries):
+        word = rnd.choice(rnd.choice(synsets).lemma_names())
+        context = " ".join(rnd.choice(synsets).definition() for _ in range(3))
+        queries.append((context, word, rnd.choice([None, "n", "v", "a"])))
+    return queries
+
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    batch_lesk = BatchLesk()
+    print(f"signature matrix: {time.perf_counter() - t0:.2f}s, "
+          f"{len(batch_lesk.synsets)} synsets, {len(batch_lesk.vocab)} tokens")
+
+    for n_queries in [1_000, 5_000]:
+        queries = random_queries(n_queries)
+        t0 = time.perf_counter()
+        expected = [lesk(context, word, pos) for context, word, pos in queries]
+        lesk_time = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        chosen = batch_lesk.disambiguate(queries)
+        batch_time = time.perf_counter() - t0
+
+        mismatches = sum(a != b for a, b in zip(expected, chosen))
+        print(f"{n_queries} queries: lesk {lesk_time:.2f}s, batched {batch_time:.2f}s, "
+              f"{mismatches} mismatches")
@@ -0,0 +1,41 @@
+import tracemalloc
+
+from text_to_timeline.timeline_construction.Event import Event
+
+
+# The dict-backed Event and BoundaryNode classes, as they were before __slots__
+class DictBoundaryNode:
+    def __init__(self, event, kind):
+        self.event = event
+        self.kind = kind
+        self.time = None
+
+
+class DictEvent:
+    def __init__(self, id):
+        self.id = id
+        self.start = DictBoundaryNode(self, 'start')
+        self.end = DictBoundaryNode(self, 'end')
+        self.children = []
+
+
+def measure(event_class, n_events:int) -> int:
+    """
+    :return: bytes allocated to build n_events events, not counting their ids.
+    """
+    ids = [f"event_{i}" for i in range(n_events)]
+    tracemalloc.start()
+    events = [event_class(i) for i in ids]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del events
+    return size
+
+
+if __name__ == "__main__":
+    print(f"{'events':>10} {'dict (MB)':>10} {'slots (MB)':>11} {'bytes/event':>12}")
+    for n_events in [10_000, 100_000, 1_000_000]:
+        dict_size = measure(DictEvent, n_events)
+        slots_size = measure(Event, n_events)
+        print(f"{n_events:>10} {dict_size / 1e6:>10.1f} {slots_size / 1e6:>11.1f} "
+              f"{dict_size // n_events:>5} -> {slots_size // n_events}")
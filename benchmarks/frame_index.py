@@ -0,0 +1,41 @@
+import random
+import re
+import time
+
+from nltk.corpus import framenet as fn
+from nltk.corpus import wordnet as wn
+
+from text_to_timeline.kg_construction.frame_index import FrameIndex
+
+# Needs the FrameNet and WordNet corpora:
+#   python -m nltk.downloader framenet_v17 wordnet
+
+
+def frames_by_lemma_scan(synset_name:str) -> str:
+    """
+    Per-node lookup with framenet.frames_by_lemma, as EdgeFD used to do it.
+    """
+    lemmas = "|".join(re.escape(lemma.name().replace("_", " ")) for lemma in wn.synset(synset_name).lemmas())
+    frames = fn.frames_by_lemma(rf"(?i)^({lemmas})\.")
+    return frames[0].name if frames else None
+
+
+if __name__ == "__main__":
+    rnd = random.Random(0)
+    synset_names = [ss.name() for ss in rnd.sample(list(wn.all_synsets()), 200)]
+
+    t0 = time.perf_counter()
+    index = FrameIndex.build()
+    print(f"build: {time.perf_counter() - t0:.2f}s, {len(index)} lemmas, {len(index.frame_names)} frames")
+
+    t0 = time.perf_counter()
+    expected = [frames_by_lemma_scan(name) for name in synset_names]
+    scan_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    resolved = index.frames_of_synsets(synset_names)
+    index_time = time.perf_counter() - t0
+
+    mismatches = sum(a != b for a, b in zip(expected, resolved))
+    print(f"{len(synset_names)} nodes: frames_by_lemma {scan_time:.2f}s, "
+          f"index {index_time * 1000:.1f}ms, {mismatches} mismatches")
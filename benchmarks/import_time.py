@@ -0,0 +1,49 @@
+import json
+import statistics
+import subprocess
+import sys
+
+# Cold-start guard: importing the package must stay fast and must not load
+#   any of the heavy dependencies, which are imported on first use instead.
+BUDGET_SECONDS = 0.1
+HEAVY_MODULES = ["spacy", "nltk", "matplotlib", "scipy", "networkx", "numpy", "pyinflect", "fastcoref"]
+
+PROBE = f"""
+import json, sys, time
+t0 = time.perf_counter()
+import text_to_timeline
+elapsed = time.perf_counter() - t0
+print(json.dumps({{
+    "elapsed": elapsed,
+    "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure_import(n_runs:int=7) -> tuple:
+    """
+    Import the package in fresh interpreters.
+    :return: (median import time in seconds, heavy modules loaded by the import)
+    """
+    times = list()
+    heavy = set()
+    for _ in range(n_runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            check=True,
+            capture_output=True,
+            text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result["elapsed"])
+        heavy.update(result["heavy"])
+    return statistics.median(times), sorted(heavy)
+
+
+if __name__ == "__main__":
+    median, heavy = measure_import()
+    print(f"import text_to_timeline: {median * 1000:.1f}ms (budget {BUDGET_SECONDS * 1000:.0f}ms)")
+    if heavy:
+        print(f"heavy modules imported eagerly: {', '.join(heavy)}")
+    if median > BUDGET_SECONDS or heavy:
+        sys.exit(1)
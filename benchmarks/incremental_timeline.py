@@ -0,0 +1,20 @@
+import time
+
+from text_to_timeline.timeline_construction.Timeline import Timeline
+from timeline_engines import PREFIX, get_maps, synthetic_event_seq, time_engine
+
+
+if __name__ == "__main__":
+    maps = get_maps()
+    print(f"{'events':>8} {'batch':>6} {'rebuild (s)':>12} {'add_relations (s)':>18}")
+    for n_events in [1_000, 10_000, 50_000]:
+        event_seq = synthetic_event_seq(n_events, 2 * n_events)
+        timeline = Timeline.from_event_seq(event_seq, *maps, PREFIX)
+
+        # a new article's worth of relations
+        batch = synthetic_event_seq(n_events, 20, seed=1)
+        rebuild_time = time_engine(event_seq + batch, "array", maps)
+        t0 = time.perf_counter()
+        timeline.add_relations(batch)
+        add_time = time.perf_counter() - t0
+        print(f"{n_events:>8} {len(batch):>6} {rebuild_time:>12.3f} {add_time:>18.4f}")
@@ -0,0 +1,31 @@
+import time
+
+import numpy as np
+
+from text_to_timeline.timeline_construction.array_timeline import get_timeline_arrays
+from timeline_engines import PREFIX, get_maps, synthetic_event_seq
+
+
+def timed(f, *args, **kwargs) -> tuple:
+    t0 = time.perf_counter()
+    result = f(*args, **kwargs)
+    return result, time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    maps = get_maps()
+    n_queries = 100_000
+    rng = np.random.default_rng(0)
+    print(f"{'events':>9} {'tree (s)':>9} {'columnar (s)':>13} "
+          f"{'tree 100k stab (s)':>19} {'columnar 100k stab (s)':>23}")
+    for n_events in [10_000, 100_000, 1_000_000]:
+        event_seq = synthetic_event_seq(n_events, 2 * n_events)
+        tree, tree_time = timed(get_timeline_arrays, event_seq, *maps, PREFIX)
+        store, store_time = timed(get_timeline_arrays, event_seq, *maps, PREFIX, output="columnar")
+
+        points = rng.integers(0, int(store.end.max()), n_queries)
+        # the tree is timed on 1000 points and extrapolated
+        _, tree_stab = timed(lambda: [len(tree.at(p)) for p in points[:1000].tolist()])
+        _, store_stab = timed(store.count_at, points)
+        print(f"{n_events:>9} {tree_time:>9.2f} {store_time:>13.2f} "
+              f"{tree_stab * n_queries / 1000:>19.2f} {store_stab:>23.4f}")
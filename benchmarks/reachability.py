@@ -0,0 +1,53 @@
+import time
+
+import numpy as np
+
+from text_to_timeline.timeline_construction.reachability import ReachabilityIndex
+from timeline_engines import PREFIX, get_maps, synthetic_event_seq
+
+
+def articles_event_seq(n_articles:int, events_per_article:int) -> list:
+    """
+    Independent timelines, one per article, as in a live feed.
+    """
+    event_seq = list()
+    for article in range(n_articles):
+        for t1, rel, t2 in synthetic_event_seq(events_per_article, 2 * events_per_article, seed=article):
+            event_seq.append([f"{article}_{t1}", rel, f"{article}_{t2}"])
+    return event_seq
+
+
+def benchmark(event_seq:list, maps:tuple, n_queries:int, rng) -> tuple:
+    """
+    :return: (number of events, build time, index size in MB, time for n_queries precedes)
+    """
+    t0 = time.perf_counter()
+    index = ReachabilityIndex.from_event_seq(event_seq, *maps, PREFIX)
+    build_time = time.perf_counter() - t0
+
+    names = list(index.event_ids)
+    a = [names[i] for i in rng.integers(0, len(names), n_queries)]
+    b = [names[i] for i in rng.integers(0, len(names), n_queries)]
+    t0 = time.perf_counter()
+    index.precedes_many(a, b)
+    query_time = time.perf_counter() - t0
+    return len(names), build_time, index.reach.nbytes / 1e6, query_time
+
+
+if __name__ == "__main__":
+    maps = get_maps()
+    rng = np.random.default_rng(0)
+    print("Many small components (one per article)")
+    print(f"{'events':>8} {'build (s)':>10} {'index (MB)':>11} {'1M precedes (s)':>16}")
+    for n_articles in [100, 1_000, 5_000]:
+        n_events, build_time, size, query_time = benchmark(articles_event_seq(n_articles, 50), maps, 1_000_000, rng)
+        print(f"{n_events:>8} {build_time:>10.3f} {size:>11.1f} {query_time:>16.3f}")
+
+    # one wide partial order, where most queries fall back to searching the DAG
+    print("One large component")
+    print(f"{'events':>8} {'build (s)':>10} {'index (MB)':>11} {'10k precedes (s)':>17}")
+    for n_events in [10_000, 30_000, 100_000]:
+        n_events, build_time, size, query_time = benchmark(
+            synthetic_event_seq(n_events, 2 * n_events, seed=0), maps, 10_000, rng
+        )
+        print(f"{n_events:>8} {build_time:>10.3f} {size:>11.1f} {query_time:>17.3f}")
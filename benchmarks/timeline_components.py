@@ -0,0 +1,27 @@
+import io
+import os
+import time
+from contextlib import redirect_stdout
+
+from text_to_timeline.timeline_construction.timeline_construction import get_timeline
+from reachability import articles_event_seq
+from timeline_engines import PREFIX, get_maps
+
+
+def time_components(event_seq:list, maps:tuple, **kwargs) -> float:
+    t0 = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        get_timeline(event_seq, *maps, PREFIX, engine="array", output="columnar", **kwargs)
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    maps = get_maps()
+    event_seq = articles_event_seq(5_000, 50)
+    print(f"{len(event_seq)} relations in 5000 components")
+    print(f"monolithic: {time_components(event_seq, maps):.2f}s")
+    n_process = 1
+    while n_process <= os.cpu_count():
+        elapsed = time_components(event_seq, maps, decompose=True, n_process=n_process)
+        print(f"decomposed, {n_process:>3} process(es): {elapsed:.2f}s")
+        n_process *= 2
@@ -0,0 +1,57 @@
+import io
+import random
+import time
+from contextlib import redirect_stdout
+
+from text_to_timeline.maps import load_tags, load_allen_intervals, load_predicate_map
+from text_to_timeline.timeline_construction.timeline_construction import get_timeline
+
+PREFIX = "boxer.owl: temp_"
+
+
+def get_maps():
+    rel_pos_tags = load_tags()["rel_pos_tags"]
+    temporal_relations_map = {
+        k: (v.get("start"), v.get("end")) for k, v in load_allen_intervals().items()
+    }
+    temporal_predicates_map = load_predicate_map()
+    return rel_pos_tags, temporal_predicates_map, temporal_relations_map
+
+
+def synthetic_event_seq(n_events:int, n_relations:int, seed:int=0) -> list:
+    """
+    Random, consistent event sequence: every relation points forward in event order.
+    """
+    rnd = random.Random(seed)
+    event_seq = list()
+    for _ in range(n_relations):
+        a, b = sorted(rnd.sample(range(n_events), 2))
+        rel = rnd.choice(["before", "intervalBefore", "then"])
+        event_seq.append([f"event_{a}", f"{PREFIX}{rel}", f"event_{b}"])
+    return event_seq
+
+
+def time_engine(event_seq:list, engine:str, maps:tuple) -> float:
+    rel_pos_tags, temporal_predicates_map, temporal_relations_map = maps
+    t0 = time.perf_counter()
+    # the graph engine prints the event sequence
+    with redirect_stdout(io.StringIO()):
+        get_timeline(
+            event_seq,
+            rel_pos_tags,
+            temporal_predicates_map,
+            temporal_relations_map,
+            PREFIX,
+            engine=engine
+        )
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    maps = get_maps()
+    print(f"{'events':>8} {'relations':>10} {'graph (s)':>10} {'array (s)':>10}")
+    for n_events in [1_000, 10_000, 50_000]:
+        event_seq = synthetic_event_seq(n_events, 2 * n_events)
+        graph_time = time_engine(event_seq, "graph", maps)
+        array_time = time_engine(event_seq, "array", maps)
+        print(f"{n_events:>8} {len(event_seq):>10} {graph_time:>10.3f} {array_time:>10.3f}")
@@ -0,0 +1,47 @@
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from text_to_timeline.kg_construction.WSDCache import WSDCache, MISSING
+
+
+def run_worker(cache:WSDCache, n_lookups:int, n_words:int, seed:int) -> int:
+    """
+    Look up batches of Zipf-distributed words, storing the misses like NodeWSD does.
+    """
+    rnd = random.Random(seed)
+    for _ in range(n_lookups // 100):
+        words = [f"word{int(rnd.paretovariate(1.0)) % n_words}" for _ in range(100)]
+        keys = [cache.make_key("nltk.wsd.lesk", word, "n", "context") for word in words]
+        cached = cache.get_many(keys)
+        cache.put_many([
+            (key, f"{word}.n.01")
+            for key, word, name in zip(keys, words, cached) if name is MISSING
+        ])
+    # write this worker's buffered lookups before the pool shuts it down
+    cache.flush()
+    return cache.hits
+
+
+if __name__ == "__main__":
+    path = os.path.join(tempfile.mkdtemp(), "wsd_cache.sqlite")
+    cache = WSDCache(path, max_entries=5_000)
+
+    for n_process in [1, 4]:
+        cache.clear()
+        t0 = time.perf_counter()
+        with ProcessPoolExecutor(n_process) as executor:
+            list(executor.map(
+                run_worker,
+                [cache] * n_process,
+                [20_000] * n_process,
+                [50_000] * n_process,
+                range(n_process)
+            ))
+        elapsed = time.perf_counter() - t0
+
+        stats = cache.stats()
+        print(f"{n_process} process(es): {20_000 * n_process / elapsed:,.0f} lookups/s, "
+              f"{stats['entries']} entries, hit rate {stats['total_hit_rate']:.2%}")
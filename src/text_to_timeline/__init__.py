@@ -1,4 +1,3 @@
-
 __version__ = '1.0.1'
 __authors__ = 'Isaac Rudnick'
 """
@@ -6,31 +5,16 @@ Knowledge Graph Construction and Timeline Analysis Package
 A comprehensive toolkit for building knowledge graphs and analyzing temporal relationships.
 """
 
-# Import key classes and functions from each submodule
-from .kg_construction.Aligner import *
-from .kg_construction.EdgeFD import *
-from .kg_construction.GraphAlignmentRule import *
-from .kg_construction.NodeWSD import *
-from .kg_construction.POSCategories import *
-from .kg_construction.SemanticGraphMerger import *
-
-# Import text rewriting functionality
-from .text_rewriting.clause_simplification import *
-
-# Import timeline construction classes
-from .timeline_construction.BoundaryNode import *
-from .timeline_construction.DSU import *
-from .timeline_construction.Event import *
-from .timeline_construction.timeline_construction import *
-
-# Import utility functions
-from .utils.pipeline import *
-from .utils.utils import *
+# Load map getters
+from .maps import *
 
-# Import processing functions
-from .kg_construction.clean_rdf_graph import *
-from .kg_construction.fastcoref_coref_resolution import *
-from .kg_construction.triplet_extraction import *
+from .utils import lazy_imports
 
-# Load map getters
-from .maps import *
\ No newline at end of file
+# Export everything the subpackages export, importing each submodule on first use
+#   call prepare_resources() once to download the corpora and models ahead of time
+lazy_imports.lazy_package(__name__, {
+    "kg_construction": None,
+    "text_rewriting": None,
+    "timeline_construction": None,
+    "utils": None,
+})
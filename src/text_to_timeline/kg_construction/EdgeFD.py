@@ -1,44 +1,48 @@
 import networkx as nx
-import spacy
-from nltk.corpus import wordnet as wn
-import nltk
-from nltk.corpus import framenet as fn
 
 from .NodeWSD import NodeWSD
-
-nltk.download('framenet_v17')
+from .frame_index import FrameIndex, get_frame_index
 
 class EdgeFD:
     def __init__(self,
                  g,
                  nlp_model=None,
                  wsd_model=None,
-                 do_wsd=True):
+                 do_wsd=True,
+                 wsd_cache=None,
+                 frame_index:FrameIndex=None):
         """
         Initialize the EdgeFD class with a graph and optional NLP model.
         :param g: The input graph (NetworkX Graph).
         :param nlp_model: Optional spaCy NLP model for processing text.
         :param wsd_model: Optional Word Sense Disambiguation model.
         :param do_wsd: Boolean indicating whether to perform word sense disambiguation.
+        :param wsd_cache: Optional WSDCache shared with NodeWSD.
+        :param frame_index: Optional FrameIndex, the shared on-disk one by default.
         """
-        self.nlp_model = nlp_model if nlp_model is not None else spacy.load("en_core_web_sm")
+        if nlp_model is None:
+            import spacy
+            nlp_model = spacy.load("en_core_web_sm")
+        self.nlp_model = nlp_model
         
         if do_wsd:
             # Initialize the Word Sense Disambiguation model and get the disambiguated graph nodes
             self.g = NodeWSD(
                 g,
                 nlp_model=self.nlp_model,
-                wsd_model=wsd_model
+                wsd_model=wsd_model,
+                cache=wsd_cache
             ).g
         else:
             self.g = g
         
+        from nltk.corpus import framenet as fn
         self.framenet = fn
+        self.frame_index = frame_index if frame_index is not None else get_frame_index()
 
-        # Map each node to its FrameNet frame
-        self.node_frames = {
-            node: self.get_framenet_frame(node) for node in self.g.nodes()
-        }
+        # Map each node to its FrameNet frame, resolving all of them in one pass
+        nodes = list(self.g.nodes())
+        self.node_frames = dict(zip(nodes, self.frame_index.frames_of_synsets(nodes)))
 
     def get_framenet_frame(self, synset_name: str) -> str:
         """
@@ -46,7 +50,4 @@ class EdgeFD:
         :param synset_name: The name of the synset or word to find the frame for.
         :return: The name of the FrameNet frame or None if not found.
         """
-        frame = self.framenet.frames_by_lemma([
-            lemma.name() for lemma in wn.synset(synset_name).lemmas()
-        ])
-        return frame[0].name if frame else None
\ No newline at end of file
+        return self.frame_index.frames_of_synsets([synset_name])[0]
\ No newline at end of file
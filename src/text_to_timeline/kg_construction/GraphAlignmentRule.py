@@ -1,6 +1,5 @@
 
 import numpy as np
-from networkx.algorithms import isomorphism
 from typing import List, Set, Tuple
 from abc import ABC, abstractmethod
 
@@ -241,10 +240,12 @@ class EmbeddingBasedRule(GraphAlignmentRule):
 class WSDandFDBasedRule(GraphAlignmentRule):
     """Rule for Word Sense Disambiguation and FrameNet-based matching."""
     
-    def __init__(self, wsd_model, fn_model, threshold: float = 0.6):
+    def __init__(self, wsd_model, fn_model, threshold: float = 0.6, wsd_cache=None):
         super().__init__("WSD and FrameNet", threshold=threshold, confidence_multiplier=1.0, priority=7)
         self.wsd_model = wsd_model
         self.fn_model = fn_model
+        # optional WSDCache, shared by every NodeWSD this rule runs
+        self.wsd_cache = wsd_cache
     
     def find_matches(self, merger_context: Aligner) -> List[Tuple[str, str, float]]:
         matches = []
@@ -253,24 +254,28 @@ class WSDandFDBasedRule(GraphAlignmentRule):
         g0_wsd = NodeWSD(
             merger_context.G0,
             nlp_model=merger_context.nlp_model,
-            wsd_model=self.wsd_model
+            wsd_model=self.wsd_model,
+            cache=self.wsd_cache
         )
         g1_wsd = NodeWSD(
             merger_context.G1,
             nlp_model=merger_context.nlp_model,
-            wsd_model=self.wsd_model
+            wsd_model=self.wsd_model,
+            cache=self.wsd_cache
         )
 
         # Get node frames for both graphs
         g0_node_frames = EdgeFD(
             g0_wsd.g,
             nlp_model=merger_context.nlp_model,
-            wsd_model=self.wsd_model
+            wsd_model=self.wsd_model,
+            wsd_cache=self.wsd_cache
         ).node_frames
         g1_node_frames = EdgeFD(
             g1_wsd.g,
             nlp_model=merger_context.nlp_model,
-            wsd_model=self.wsd_model
+            wsd_model=self.wsd_model,
+            wsd_cache=self.wsd_cache
         ).node_frames
 
         # Match nodes based on WSD and FrameNet frames
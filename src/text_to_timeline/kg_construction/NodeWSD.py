@@ -1,32 +1,51 @@
-import spacy
 import networkx as nx
-from nltk.wsd import lesk
-from nltk.corpus import wordnet as wn
 
 from .POSCategories import POSCategories
+from .batch_lesk import get_batch_lesk
+from .WSDCache import WSDCache, MISSING
 
 class NodeWSD:
     def __init__(self,
                     g,
                     nlp_model=None,
-                    wsd_model=None):
-        self.nlp_model = nlp_model if nlp_model is not None\
-                            else spacy.load("en_core_web_sm")
-        self.wsd_model = wsd_model if wsd_model is not None\
-                            else lesk
+                    wsd_model=None,
+                    cache:WSDCache=None):
+        """
+        :param cache: Optional WSDCache to reuse results across graphs, runs and processes.
+        """
+        if nlp_model is None:
+            import spacy
+            nlp_model = spacy.load("en_core_web_sm")
+        if wsd_model is None:
+            from nltk.wsd import lesk
+            wsd_model = lesk
+        self.nlp_model = nlp_model
+        self.wsd_model = wsd_model
         self.pos_categories = POSCategories()
+        self.cache = cache
+
+        words = list(g.nodes())
+        # each node's context is built from its own edges only, so all of them take one pass over the graph
+        contexts = [
+            self.get_context(w, [(e[0], e[2]["labels"], e[1]) for e in g.edges(w, data=True)])
+            for w in words
+        ]
+        pos_tags = self.get_nodes_pos(g, words, contexts)
+        # as in node_synset_from_kg, nodes without any triples and multi-token words (ex: Mr. Holmes)
+        #   are disambiguated on their own
+        word_texts = [w.split("_")[0] for w in words]
+        queries = [
+            (context if context and len(self.nlp_model.make_doc(text)) <= 1 else text, w, pos)
+            for w, text, context, pos in zip(words, word_texts, contexts, pos_tags)
+        ]
+
+        synsets = self.disambiguate_queries(queries)
 
         # map each noun node in to its disambiguated sense
         self.g = nx.relabel_nodes(
             G=g,
             mapping={
-                w: self.synset_to_str(self.node_synset_from_kg(
-                    word=w,
-                    nlp_model=nlp_model,
-                    edge_list=[
-                        (e[0], e[2]["labels"], e[1]) for e in g.edges(w, data=True)
-                    ]
-                )) for w in g.nodes()
+                w: self.synset_to_str(synset) for w, synset in zip(words, synsets)
             }
         )
 
@@ -44,21 +63,71 @@ class NodeWSD:
         return ". ".join(relevant_triple_strings)
 
 
-    def node_synset_from_kg(self,
+    def wordnet_pos(self, pos_tag:str) -> str:
+        """
+        Map a spaCy POS tag to a WordNet POS, or None if there's no matching one.
+        """
+        if pos_tag in self.pos_categories.entity_types:
+            return "n"
+        elif pos_tag in self.pos_categories.predicate_types:
+            return "v"
+        elif pos_tag in self.pos_categories.modifier_types:
+            return "a"
+        return None
+
+
+    def get_nodes_pos(self,
+                    g,
+                    words:list,
+                    contexts:list) -> list:
+        """
+        WordNet POS of every node, from the POS tags SplitTriplets stores on the nodes it creates.
+        Nodes without one are tagged from their contexts, parsing all of them in one nlp_model.pipe call.
+        """
+        pos_tags = [None] * len(words)
+        untagged = list()
+        for i, w in enumerate(words):
+            if g.nodes[w].get("pos") is not None:
+                pos_tags[i] = self.wordnet_pos(g.nodes[w]["pos"])
+            else:
+                untagged.append(i)
+
+        # empty texts are kept, since words like "_1" have no text before their id
+        texts = dict.fromkeys(
+            text for i in untagged
+            for text in (words[i].split("_")[0], contexts[i])
+        )
+        docs = dict(zip(texts, self.nlp_model.pipe(texts)))
+        for i in untagged:
+            pos_tags[i], _ = self.get_pos_and_context(
+                words[i],
+                self.nlp_model,
+                context_doc=docs[contexts[i]],
+                word_doc=docs[words[i].split("_")[0]]
+            )
+        return pos_tags
+
+
+    def get_pos_and_context(self,
                     word:str,
                     nlp_model,
                     edge_list:list=None,
-                    context_doc=None) -> str:
+                    context_doc=None,
+                    word_doc=None) -> tuple:
+        """
+        :return: (WordNet POS of the word in its context or None, context Doc)
+        """
         if not word:
           raise ValueError(f"word cannot be {word}")
-        
+
         # handle words with unique ids
-        word_doc = self.nlp_model(word.split("_")[0])
+        if word_doc is None:
+            word_doc = self.nlp_model(word.split("_")[0])
 
         # if no edge list or context doc was provided
         if (not edge_list) and (not context_doc):
             pos = None
-        
+
         # if context was provided, but the word is a multi-token phrase (ex: Mr.Holmes),
         #   assume it's a noun
         elif len(word_doc) > 1:
@@ -73,7 +142,7 @@ class NodeWSD:
                         word,
                         edge_list
                 ))
-            
+
             # get a list of POS tags for every occurrence of the word in question
             all_word_pos_tags = list()
             for token in context_doc:
@@ -82,44 +151,134 @@ class NodeWSD:
 
             pos = None
             # use the most common POS tag for the word in the context
-            try:
+            if all_word_pos_tags:
                 most_frequent_pos = max(all_word_pos_tags,
                                         key=lambda x: all_word_pos_tags.count(x))
-                if most_frequent_pos in self.pos_categories.entity_types:
-                    pos = "n"
-                elif most_frequent_pos in self.pos_categories.predicate_types:
-                    pos = "v"
-                elif most_frequent_pos in self.pos_categories.modifier_types:
-                    pos = "a"
-                else:
+                pos = self.wordnet_pos(most_frequent_pos)
+                if pos is None:
                     print(all_word_pos_tags)
                     print(word)
                     print(context_doc.text)
-                    raise Exception("Invalid POS tag")
-
-            except Exception as ex:
-                pos = None
 
         if not context_doc:
           context_doc = word_doc
 
+        return pos, context_doc
+
+
+    def node_synset_from_kg(self,
+                    word:str,
+                    nlp_model,
+                    edge_list:list=None,
+                    context_doc=None) -> str:
+        pos, context_doc = self.get_pos_and_context(
+            word,
+            nlp_model,
+            edge_list,
+            context_doc
+        )
+        return self.disambiguate(context_doc.text, word, pos)
+
+
+    def disambiguate(self,
+                    context:str,
+                    word:str,
+                    pos:str=None):
         synset = self.wsd_model(
-            context_sentence=context_doc.text,
+            context_sentence=context,
             ambiguous_word=word,
             pos=pos
         )
         if synset is None:
             synset = self.wsd_model(
-                context_sentence=context_doc.text,
+                context_sentence=context,
                 ambiguous_word=word
             )
-        
-        print(f"Word context: {context_doc.text}")
+
+        print(f"Word context: {context}")
         print(f"Word sense: {self.synset_to_str(synset)}")
         print()
 
         return synset if synset else None
-    
+
+
+    def disambiguate_queries(self, queries:list) -> list:
+        """
+        Disambiguate (context, word, pos) queries, looking them up in the cache first if there is one.
+        """
+        if self.cache is None:
+            return self.disambiguate_uncached(queries)
+
+        model_name = self.model_name()
+        keys = [
+            self.cache.make_key(model_name, word, pos, context)
+            for context, word, pos in queries
+        ]
+        cached = self.cache.get_many(keys)
+
+        from nltk.corpus import wordnet as wn
+
+        missing = [i for i, name in enumerate(cached) if name is MISSING]
+        computed = self.disambiguate_uncached([queries[i] for i in missing])
+        self.cache.put_many([
+            (keys[i], synset.name() if synset is not None else None)
+            for i, synset in zip(missing, computed)
+        ])
+
+        synsets = [
+            None if name is MISSING or name is None else wn.synset(name)
+            for name in cached
+        ]
+        for i, synset in zip(missing, computed):
+            synsets[i] = synset
+        return synsets
+
+
+    def disambiguate_uncached(self, queries:list) -> list:
+        from nltk.wsd import lesk
+
+        if self.wsd_model is lesk:
+            # score every node at once, with the same choices as lesk
+            return self.disambiguate_batch(queries)
+        return [
+            self.disambiguate(context, word, pos) for context, word, pos in queries
+        ]
+
+
+    def model_name(self) -> str:
+        """
+        Name of the WSD model, to keep different models' results apart in the cache.
+        """
+        model = self.wsd_model
+        qualname = getattr(model, "__qualname__", type(model).__qualname__)
+        return f"{getattr(model, '__module__', '')}.{qualname}"
+
+
+    def disambiguate_batch(self, queries:list) -> list:
+        """
+        Batched disambiguate for the default lesk model,
+            scoring every (context, word, pos) query in one BatchLesk pass.
+        """
+        if not queries:
+            return []
+        batch_lesk = get_batch_lesk()
+        synsets = batch_lesk.disambiguate(queries)
+
+        # retry the words with no synset for their POS without one
+        retry = [i for i, synset in enumerate(synsets) if synset is None]
+        retried = batch_lesk.disambiguate([
+            (queries[i][0], queries[i][1], None) for i in retry
+        ])
+        for i, synset in zip(retry, retried):
+            synsets[i] = synset
+
+        for (context, _, _), synset in zip(queries, synsets):
+            print(f"Word context: {context}")
+            print(f"Word sense: {self.synset_to_str(synset)}")
+            print()
+
+        return synsets
+
 
     def synset_to_str(self, synset) -> str:
         """
@@ -128,4 +287,4 @@ class NodeWSD:
         :return: The string representation of the synset.
         """
         # parse the sense/synset label
-        return str(synset).split("(")[-1][:-1]
\ No newline at end of file
+        return str(synset).split("(")[-1][:-1]
@@ -1,6 +1,5 @@
 import numpy as np
 import networkx as nx
-from scipy.optimize import linear_sum_assignment
 import re
 from typing import Dict, List, Set, Tuple, Optional, Any, Callable
 
@@ -177,6 +176,7 @@ class SemanticGraphMerger(Aligner):
             cost_matrix[i, j] = 1.0 - confidence
         
         # Apply Hungarian algorithm
+        from scipy.optimize import linear_sum_assignment
         row_indices, col_indices = linear_sum_assignment(cost_matrix)
         
         # Extract optimal matches
@@ -0,0 +1,231 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from text_to_timeline.utils.utils import stable_id
+
+# marks a key that isn't in the cache, since None is a valid cached result
+MISSING = object()
+
+
+class WSDCache:
+    """
+    Persistent cache of word sense disambiguation results, backed by SQLite.
+    Results are keyed by (model, word, POS, context), bounded to max_entries with
+        least-recently-used eviction, and shared by every process that opens the same path:
+        each process gets its own connection, and the database runs in WAL mode
+        so readers don't block the writer.
+    Lookups only read the database: their recency and hit-rate updates are buffered
+        and written along with the next put_many, on stats(), flush() and close(),
+        so worker processes should flush or close the cache before they exit.
+    The size is only counted, and the cache evicted down to max_entries, every tenth of max_entries stores,
+        so it may briefly hold up to a tenth more results (per process writing to it).
+    """
+
+    def __init__(self,
+                 path:str=None,
+                 max_entries:int=1_000_000,
+                 timeout:float=30.0,
+                 flush_every:int=10_000):
+        """
+        :param path: SQLite database file, or None for an in-memory cache private to this process.
+        :param max_entries: Maximum number of cached results.
+        :param timeout: Seconds to wait for another process's write lock.
+        :param flush_every: Number of buffered recency updates that forces a flush.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.flush_every = flush_every
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._pid = None
+        self._reset_pending()
+
+    def _reset_pending(self):
+        # last use of the results read since the last flush, and the lookups not counted in the database yet
+        self._last_used = dict()
+        self._pending_hits = 0
+        self._pending_misses = 0
+        # results that can still be stored before the size needs counting again
+        self._room = 0
+
+    def __getstate__(self):
+        # connections can't be shared between processes, so workers open their own,
+        #   and the buffered updates stay with the process that made them
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_pid"] = None
+        state["_last_used"] = dict()
+        state["_pending_hits"] = 0
+        state["_pending_misses"] = 0
+        state["_room"] = 0
+        return state
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(
+                self.path if self.path is not None else ":memory:",
+                timeout=self.timeout,
+                isolation_level=None
+            )
+            if self.path is not None:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS wsd_cache ("
+                "key INTEGER PRIMARY KEY, synset TEXT, last_used INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS wsd_cache_last_used ON wsd_cache (last_used)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS wsd_cache_stats ("
+                "id INTEGER PRIMARY KEY CHECK (id = 0), hits INTEGER NOT NULL, misses INTEGER NOT NULL)"
+            )
+            conn.execute("INSERT OR IGNORE INTO wsd_cache_stats VALUES (0, 0, 0)")
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    @staticmethod
+    def make_key(model:str, word:str, pos:str, context:str) -> int:
+        # SQLite integers are signed
+        key = stable_id(model, word, pos, context)
+        return key - (1 << 64) if key >= 1 << 63 else key
+
+    def get_many(self, keys:list) -> list:
+        """
+        :return: the cached synset name (or None) for each key, or MISSING.
+        """
+        if not keys:
+            return []
+        conn = self.conn
+        found = dict()
+        unique_keys = list(dict.fromkeys(keys))
+        # stay under SQLite's limit on query parameters
+        for i in range(0, len(unique_keys), 500):
+            chunk = unique_keys[i:i + 500]
+            found.update(conn.execute(
+                f"SELECT key, synset FROM wsd_cache WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall())
+
+        results = [found.get(key, MISSING) for key in keys]
+        hits = sum(result is not MISSING for result in results)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        self._pending_hits += hits
+        self._pending_misses += len(keys) - hits
+
+        now = time.time_ns()
+        self._last_used.update((key, now) for key in found)
+        if len(self._last_used) >= self.flush_every:
+            self.flush()
+        return results
+
+    def put_many(self, items:list):
+        """
+        :param items: list of (key, synset name or None) pairs.
+        """
+        if not items:
+            return
+        conn = self.conn
+        now = time.time_ns()
+        with self.transaction(conn):
+            # write the buffered recency first, so results read since the last flush aren't evicted
+            self._write_pending(conn)
+            conn.executemany(
+                "INSERT OR REPLACE INTO wsd_cache (key, synset, last_used) VALUES (?, ?, ?)",
+                [(key, synset, now) for key, synset in items]
+            )
+            self._room -= len(items)
+            if self._room < 0:
+                # evict the least recently used results
+                excess = conn.execute("SELECT COUNT(*) FROM wsd_cache").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    conn.execute(
+                        "DELETE FROM wsd_cache WHERE key IN "
+                        "(SELECT key FROM wsd_cache ORDER BY last_used LIMIT ?)",
+                        (excess,)
+                    )
+                self._room = max(self.max_entries // 10, 1)
+
+    def flush(self):
+        """
+        Write the buffered recency and hit-rate updates to the database.
+        """
+        if not self._last_used and not self._pending_hits and not self._pending_misses:
+            return
+        conn = self.conn
+        with self.transaction(conn):
+            self._write_pending(conn)
+
+    def _write_pending(self, conn):
+        conn.executemany(
+            "UPDATE wsd_cache SET last_used = ? WHERE key = ?",
+            [(now, key) for key, now in self._last_used.items()]
+        )
+        conn.execute(
+            "UPDATE wsd_cache_stats SET hits = hits + ?, misses = misses + ? WHERE id = 0",
+            (self._pending_hits, self._pending_misses)
+        )
+        self._last_used = dict()
+        self._pending_hits = 0
+        self._pending_misses = 0
+
+    def get(self, key:int):
+        return self.get_many([key])[0]
+
+    def put(self, key:int, synset:str):
+        self.put_many([(key, synset)])
+
+    @staticmethod
+    @contextmanager
+    def transaction(conn):
+        # take the write lock up front, so concurrent writers wait instead of failing mid-transaction
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM wsd_cache").fetchone()[0]
+
+    def stats(self) -> dict:
+        """
+        Hit-rate statistics for this instance and for every process that used the cache.
+        """
+        self.flush()
+        total_hits, total_misses = self.conn.execute(
+            "SELECT hits, misses FROM wsd_cache_stats WHERE id = 0"
+        ).fetchone()
+        lookups = self.hits + self.misses
+        total_lookups = total_hits + total_misses
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "total_hits": total_hits,
+            "total_misses": total_misses,
+            "total_hit_rate": total_hits / total_lookups if total_lookups else 0.0,
+        }
+
+    def clear(self):
+        with self.transaction(self.conn):
+            self.conn.execute("DELETE FROM wsd_cache")
+            self.conn.execute("UPDATE wsd_cache_stats SET hits = 0, misses = 0 WHERE id = 0")
+        self.hits = 0
+        self.misses = 0
+        self._reset_pending()
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self.flush()
+            self._conn.close()
+        self._conn = None
+        self._pid = None
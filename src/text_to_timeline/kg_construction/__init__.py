@@ -1,11 +1,35 @@
 """Knowledge Graph Construction Module"""
 
-from .Aligner import *
-from .EdgeFD import *
-from .GraphAlignmentRule import *
-from .NodeWSD import *
-from .POSCategories import *
-from .SemanticGraphMerger import *
-from .clean_rdf_graph import *
-from .fastcoref_coref_resolution import *
-from .triplet_extraction import *
\ No newline at end of file
+from ..utils import lazy_imports
+
+# submodules are imported on first use, see utils/lazy_imports.py
+lazy_imports.lazy_package(__name__, {
+    "Aligner": ["Aligner"],
+    "EdgeFD": ["EdgeFD"],
+    "GraphAlignmentRule": [
+        "GraphAlignmentRule", "ExactMatchRule", "NamespaceAwareRule", "StructuralSimilarityRule",
+        "SubgraphMatchingRule", "EmbeddingBasedRule", "WSDandFDBasedRule",
+    ],
+    "NodeWSD": ["NodeWSD"],
+    "POSCategories": ["POSCategories"],
+    "SemanticGraphMerger": ["SemanticGraphMerger"],
+    "WSDCache": ["MISSING", "WSDCache"],
+    "batch_lesk": ["BatchLesk", "get_batch_lesk"],
+    "clean_rdf_graph": [
+        "propagate_types", "prune_subgraph_types", "disambiguate_predicate", "disambiguate_predicates",
+    ],
+    "fastcoref_coref_resolution": [
+        "SENTENCE_BOUNDARY", "get_replacements", "get_cluster_matches", "resolve_text", "resolve_texts",
+        "clusters_from_pred", "get_sentence_spans", "get_windows", "get_clusters_windowed", "get_clusters",
+        "get_clusters_batch", "replace_clusters", "ambiguate_from_clusters", "ambiguate_text",
+        "ambiguate_texts", "get_token_clusters", "resolve_doc", "compile_pronoun_pattern",
+        "default_pronoun_pattern", "passthrough_coref", "CorefStage", "get_coref_stage",
+    ],
+    "frame_index": [
+        "FRAME_INDEX_VERSION", "DEFAULT_FRAME_INDEX_PATH", "normalize_lemma", "FrameIndex", "get_frame_index",
+    ],
+    "triplet_extraction": [
+        "get_verb_conj_objs", "get_valency", "get_subj_from_conj", "get_subj", "handle_complement_phrases",
+        "get_subj_dobj", "iter_edges", "get_edges", "SplitTriplets",
+    ],
+})
@@ -0,0 +1,110 @@
+from functools import lru_cache
+
+import numpy as np
+
+
+class BatchLesk:
+    """
+    Batched equivalent of nltk.wsd.lesk.
+    The gloss signature of every WordNet synset (the distinct tokens of its definition)
+        is precomputed once as a CSR matrix over a token vocabulary, and a batch of
+        (context, word, pos) queries is scored against all their candidate synsets at once.
+    Like lesk, each query picks its first candidate with the most signature tokens in set(context).
+    """
+
+    def __init__(self, wordnet=None):
+        """
+        :param wordnet: WordNet corpus reader, nltk's by default.
+        """
+        if wordnet is None:
+            from nltk.corpus import wordnet
+        self.wordnet = wordnet
+
+        self.synsets = list(self.wordnet.all_synsets())
+        self.synset_rows = {ss.name(): i for i, ss in enumerate(self.synsets)}
+        self.pos = np.array([str(ss.pos()) for ss in self.synsets], dtype=object)
+
+        # gloss signature matrix, one row of distinct token ids per synset
+        self.vocab = dict()
+        indices = list()
+        indptr = [0]
+        for ss in self.synsets:
+            indices.extend(sorted(
+                self.vocab.setdefault(token, len(self.vocab))
+                for token in set(ss.definition().split())
+            ))
+            indptr.append(len(indices))
+        self.indices = np.array(indices, dtype=np.int64)
+        self.indptr = np.array(indptr, dtype=np.int64)
+
+        self._candidates = dict()
+
+    def candidates(self, word:str, pos:str=None) -> np.ndarray:
+        """
+        :return: signature rows of the word's synsets, in WordNet's order.
+        """
+        if word not in self._candidates:
+            self._candidates[word] = np.array(
+                [self.synset_rows[ss.name()] for ss in self.wordnet.synsets(word)],
+                dtype=np.int64
+            )
+        rows = self._candidates[word]
+        if pos:
+            rows = rows[self.pos[rows] == pos]
+        return rows
+
+    def disambiguate(self, queries:list) -> list:
+        """
+        :param queries: list of (context_sentence, ambiguous_word, pos) tuples.
+        :return: the chosen synset for each query, or None if it has no candidates.
+        """
+        results = [None] * len(queries)
+        candidates = [self.candidates(word, pos) for _, word, pos in queries]
+        answered = [i for i, rows in enumerate(candidates) if len(rows)]
+        if not answered:
+            return results
+
+        # one (query, synset) pair per candidate, grouped by query
+        n_candidates = np.array([len(candidates[i]) for i in answered])
+        pair_query = np.repeat(np.arange(len(answered)), n_candidates)
+        pair_row = np.concatenate([candidates[i] for i in answered])
+
+        # context token ids of each query, as sorted query * |vocab| + token keys
+        n_vocab = len(self.vocab) + 1
+        context_keys = np.unique(np.array([
+            q * n_vocab + self.vocab[token]
+            for q, i in enumerate(answered)
+            for token in set(queries[i][0])
+            if token in self.vocab
+        ], dtype=np.int64))
+
+        # score every pair with one gather over the signature matrix
+        starts = self.indptr[pair_row]
+        lengths = self.indptr[pair_row + 1] - starts
+        pair_of_token = np.repeat(np.arange(len(pair_row)), lengths)
+        token_idx = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        keys = pair_query[pair_of_token] * n_vocab + self.indices[token_idx]
+        hits = np.isin(keys, context_keys, assume_unique=False)
+        scores = np.bincount(pair_of_token, weights=hits, minlength=len(pair_row))
+
+        # first candidate with the best score in each query, as max() picks it
+        group_starts = np.cumsum(n_candidates) - n_candidates
+        best = np.maximum.reduceat(scores, group_starts)
+        position = np.where(scores == best[pair_query], np.arange(len(pair_row)), len(pair_row))
+        chosen = pair_row[np.minimum.reduceat(position, group_starts)]
+
+        for i, row in zip(answered, chosen.tolist()):
+            results[i] = self.synsets[row]
+        return results
+
+    def __call__(self, context_sentence, ambiguous_word:str, pos:str=None):
+        # same signature as nltk.wsd.lesk
+        return self.disambiguate([(context_sentence, ambiguous_word, pos)])[0]
+
+
+@lru_cache(maxsize=None)
+def get_batch_lesk() -> BatchLesk:
+    """
+    Shared BatchLesk over nltk's WordNet, built on first use.
+    """
+    return BatchLesk()
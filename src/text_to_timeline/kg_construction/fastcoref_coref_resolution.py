@@ -1,3 +1,17 @@
+import re
+import time
+from collections import defaultdict, deque
+from functools import lru_cache
+from itertools import islice
+from weakref import WeakKeyDictionary
+
+from text_to_timeline.maps import load_pronouns
+from text_to_timeline.timeline_construction.DSU import DSU
+
+# whitespace following sentence-final punctuation (optionally followed by a closing quote/bracket)
+SENTENCE_BOUNDARY = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"')\]]))\s+")
+
+
 def get_replacements(d: dict) -> dict:
   """
   returns a list of tuples
@@ -64,16 +78,145 @@ def resolve_text(text:str, coref_resolution_model) -> str:
   return doc._.resolved_text
 
 
-def get_clusters(text:str, fast_coref_model) -> dict:
+def resolve_texts(texts,
+                  coref_resolution_model,
+                  batch_size:int=32,
+                  n_process:int=1):
+  """
+  streaming version of resolve_text
+    yields the resolved text of each input text, in input order
+  """
+  docs = coref_resolution_model.pipe(
+    texts,
+    batch_size=batch_size,
+    n_process=n_process,
+    component_cfg={"fastcoref": {'resolve_text': True}}
+  )
 
-  # get the coreference clusters
-  preds = fast_coref_model.predict(texts=[text])
-  all_clusters = preds[0].get_clusters(as_strings=False)
+  for doc in docs:
+    yield doc._.resolved_text
+
+
+def clusters_from_pred(pred) -> dict:
+  all_clusters = pred.get_clusters(as_strings=False)
 
   # get disambiguated clusters
   return {f"E{i}": clusters for i, clusters in enumerate(all_clusters)}
 
 
+def get_sentence_spans(text:str) -> list:
+  """
+  returns a list of (start, end) character spans, one per sentence
+  """
+  spans = list()
+  start = 0
+  for m in SENTENCE_BOUNDARY.finditer(text):
+    spans.append((start, m.start()))
+    start = m.end()
+  if start < len(text):
+    spans.append((start, len(text)))
+  return spans
+
+
+def get_windows(sentence_spans:list,
+                window_size:int,
+                window_overlap:int):
+  """
+  yields (start, end) character spans of overlapping windows of window_size sentences,
+    consecutive windows sharing window_overlap sentences
+  """
+  if window_overlap >= window_size:
+    raise ValueError(f"window_overlap ({window_overlap}) must be smaller than window_size ({window_size})")
+
+  step = window_size - window_overlap
+  i = 0
+  while True:
+    j = min(i + window_size, len(sentence_spans))
+    yield sentence_spans[i][0], sentence_spans[j - 1][1]
+    if j >= len(sentence_spans):
+      break
+    i += step
+
+
+def get_clusters_windowed(text:str,
+                          fast_coref_model,
+                          window_size:int=10,
+                          window_overlap:int=2) -> dict:
+  """
+  gets the coreference clusters by running coref over overlapping sentence windows,
+    so only one window is held by the model at a time
+
+  clusters from different windows are stitched together wherever they share a mention
+    (which happens in the sentences where windows overlap)
+  """
+  sentence_spans = get_sentence_spans(text)
+  if len(sentence_spans) <= window_size:
+    preds = fast_coref_model.predict(texts=[text])
+    return clusters_from_pred(preds[0])
+
+  # clusters are keyed by (window index, cluster index)
+  dsu = DSU()
+  mention_clusters = dict()
+  cluster_mentions = defaultdict(set)
+
+  for w, (start, end) in enumerate(get_windows(sentence_spans, window_size, window_overlap)):
+    preds = fast_coref_model.predict(texts=[text[start:end]])
+    for c, cluster in enumerate(preds[0].get_clusters(as_strings=False)):
+      key = (w, c)
+      dsu.find(key)
+      for m_start, m_end in cluster:
+        # shift the mention to its position in the full text
+        mention = (m_start + start, m_end + start)
+        cluster_mentions[key].add(mention)
+        # link clusters from different windows that share a mention
+        if mention in mention_clusters:
+          dsu.union(mention_clusters[mention], key)
+        else:
+          mention_clusters[mention] = key
+
+  stitched = defaultdict(set)
+  for key, mentions in cluster_mentions.items():
+    stitched[dsu.find(key)] |= mentions
+
+  # number the clusters in order of their first mention
+  all_clusters = sorted(
+    (sorted(mentions) for mentions in stitched.values()),
+    key=lambda c: c[0]
+  )
+  return {f"E{i}": cluster for i, cluster in enumerate(all_clusters)}
+
+
+def get_clusters(text:str,
+                 fast_coref_model,
+                 window_size:int=None,
+                 window_overlap:int=2) -> dict:
+
+  # for long texts, run coref over sentence windows
+  if window_size:
+    return get_clusters_windowed(
+      text,
+      fast_coref_model,
+      window_size=window_size,
+      window_overlap=window_overlap
+    )
+
+  # get the coreference clusters
+  preds = fast_coref_model.predict(texts=[text])
+  return clusters_from_pred(preds[0])
+
+
+def get_clusters_batch(texts:list, fast_coref_model) -> list:
+  """
+  returns a list of cluster dicts, one per text, in input order
+    uses a single batched FCoref inference for the whole list
+  """
+  if not texts:
+    return list()
+
+  preds = fast_coref_model.predict(texts=list(texts))
+  return [clusters_from_pred(p) for p in preds]
+
+
 def replace_clusters(text:str,
                      replacements: list) -> str:
 
@@ -88,12 +231,10 @@ def replace_clusters(text:str,
   return "".join(new_text)
 
 
-def ambiguate_text(resolved_text: str,
-                   fast_coref_model) -> tuple:
+def ambiguate_from_clusters(resolved_text: str,
+                            clusters: dict) -> tuple:
   # restructure the clusters dict for replacement
-  replacements = get_replacements(
-    get_clusters(resolved_text, fast_coref_model)
-  )
+  replacements = get_replacements(clusters)
 
   # replace the cluster matches
   cluster_strings = get_cluster_matches(
@@ -107,4 +248,367 @@ def ambiguate_text(resolved_text: str,
     replacements
   )
 
-  return cluster_strings, ambiguated_text
\ No newline at end of file
+  return cluster_strings, ambiguated_text
+
+
+def ambiguate_text(resolved_text: str,
+                   fast_coref_model) -> tuple:
+  return ambiguate_from_clusters(
+    resolved_text,
+    get_clusters(resolved_text, fast_coref_model)
+  )
+
+
+def ambiguate_texts(resolved_texts: list,
+                    fast_coref_model) -> list:
+  """
+  batched version of ambiguate_text
+    returns a list of (cluster_strings, ambiguated_text) tuples, in input order
+  """
+  all_clusters = get_clusters_batch(resolved_texts, fast_coref_model)
+  return [
+    ambiguate_from_clusters(text, clusters)
+    for text, clusters in zip(resolved_texts, all_clusters)
+  ]
+
+
+def get_token_clusters(doc, char_clusters:list) -> list:
+  """
+  converts character-span clusters to inclusive (start, end) token-span clusters
+  """
+  token_clusters = list()
+  for cluster in char_clusters:
+    token_cluster = list()
+    for start, end in cluster:
+      span = doc.char_span(start, end, alignment_mode="expand")
+      if span is not None:
+        token_cluster.append((span.start, span.end - 1))
+    token_clusters.append(token_cluster)
+  return token_clusters
+
+
+def resolve_doc(doc, token_clusters:list) -> tuple:
+  """
+  resolves coreferences in the same way as fastcoref's resolve_text,
+    while keeping track of where each mention ends up in the resolved text
+
+  returns a tuple
+    tuple[0] = resolved text
+    tuple[1] = clusters dict, as returned by get_clusters,
+                but with character spans taken from the resolved text
+  """
+  # each token is a [text, tail] pair, so offsets in the resolved text can be recovered
+  #   the tail holds the token's whitespace (and a possessive suffix, which isn't part of the mention)
+  parts = [[t.text, t.whitespace_] for t in doc]
+  all_mentions = [m for cluster in token_clusters for m in cluster]
+
+  for cluster in token_clusters:
+    noun_indices = [
+      i for i, (start, end) in enumerate(cluster)
+      if any(t.pos_ in {"NOUN", "PROPN"} for t in doc[start:end + 1])
+    ]
+    if not noun_indices:
+      continue
+
+    head = cluster[noun_indices[0]]
+    head_text = doc[head[0]:head[1] + 1].text
+    for start, end in cluster:
+      if (start, end) == head:
+        continue
+      # skip mentions that contain other mentions
+      if any(m != (start, end) and start <= m[0] and m[1] <= end for m in all_mentions):
+        continue
+
+      final_token = doc[end]
+      if final_token.tag_ in {"PRP$", "POS"}:
+        parts[start] = [head_text, "'s" + final_token.whitespace_]
+      else:
+        parts[start] = [head_text, final_token.whitespace_]
+      for i in range(start + 1, end + 1):
+        parts[i] = ["", ""]
+
+  # get the offset of each token in the resolved text
+  offsets = list()
+  position = 0
+  for text, tail in parts:
+    offsets.append(position)
+    position += len(text) + len(tail)
+
+  def resolved_span(start, end):
+    last = end
+    while last > start and not parts[last][0]:
+      last -= 1
+    return (offsets[start], offsets[last] + len(parts[last][0]))
+
+  resolved_text = "".join(text + tail for text, tail in parts)
+  clusters = {
+    f"E{i}": [resolved_span(start, end) for start, end in cluster]
+    for i, cluster in enumerate(c for c in token_clusters if len(c) > 1)
+  }
+
+  return resolved_text, clusters
+
+
+def compile_pronoun_pattern(pronouns=None):
+  """
+  compiles the pronoun inventory from maps/coref_disambiguation/pronouns.json
+    into a single case-insensitive, whole-word regex
+    the default inventory is only read and compiled once
+  """
+  if pronouns is None:
+    return default_pronoun_pattern()
+  # longest first, so the alternation doesn't stop at a shorter prefix
+  alternation = "|".join(re.escape(p) for p in sorted(pronouns, key=len, reverse=True))
+  return re.compile(rf"\b(?:{alternation})\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=None)
+def default_pronoun_pattern():
+  return compile_pronoun_pattern(load_pronouns().keys())
+
+
+def passthrough_coref(text:str) -> dict:
+  """
+  coref stage output for a text that doesn't need coreference resolution
+  """
+  return {
+    "resolved": text,
+    "clusters": dict(),
+    "replacements": list(),
+    "cluster_matches": dict(),
+    "ambiguated": text,
+  }
+
+
+class CorefStage:
+  """
+  Single-pass coreference stage.
+  Runs the fastcoref spaCy component once per document and derives the resolved text,
+    the clusters, the placeholder replacements and the ambiguated text from that one inference,
+    instead of running FCoref again on the resolved text (see resolve_text and ambiguate_text).
+  The time spent in FCoref inference alone is recorded in stats["fastcoref_seconds"],
+    as the cost of the second inference the two-pass mode would have run.
+  """
+
+  def __init__(self,
+               coref_resolution_model,
+               pronoun_gate:bool=True,
+               pronoun_pattern=None,
+               fast_coref_model=None,
+               window_size:int=None,
+               window_overlap:int=2):
+    """
+    :param coref_resolution_model: spaCy pipeline with the fastcoref component added.
+    :param pronoun_gate: Whether to skip coref for texts without any pronouns.
+    :param pronoun_pattern: Optional compiled regex to use as the gate,
+      defaults to one built from maps/coref_disambiguation/pronouns.json.
+    :param fast_coref_model: FCoref model, only needed for windowed mode.
+    :param window_size: If set, texts with more sentences than this
+      are resolved over overlapping windows of this many sentences.
+    :param window_overlap: Number of sentences shared by consecutive windows.
+    """
+    if window_size and fast_coref_model is None:
+      raise ValueError("fast_coref_model required when window_size is set")
+
+    self.coref_resolution_model = coref_resolution_model
+    self.fast_coref_model = fast_coref_model
+    self.window_size = window_size
+    self.window_overlap = window_overlap
+    self.pronoun_gate = pronoun_gate
+    self.pronoun_pattern = pronoun_pattern if pronoun_pattern is not None\
+                            else compile_pronoun_pattern()
+    self.stats = {
+      "docs": 0,
+      # number of docs that skipped coref because the gate found no pronouns
+      "gated_docs": 0,
+      # number of docs resolved over sentence windows
+      "windowed_docs": 0,
+      # time in the coref pipeline (the whole spaCy pipeline, not only fastcoref),
+      #   or in the windowed FCoref inferences
+      "coref_seconds": 0.0,
+      # time in the fastcoref component on its own, or in the windowed FCoref inferences,
+      #   which is what single-pass mode saves over running FCoref again on the resolved text
+      #   (not measured for texts piped with n_process > 1, since spaCy's workers run the components)
+      "fastcoref_seconds": 0.0,
+    }
+
+  def process_doc(self,
+                  doc,
+                  coref_seconds:float=0.0,
+                  char_clusters:list=None,
+                  fastcoref_seconds:float=0.0) -> dict:
+    if char_clusters is None:
+      char_clusters = doc._.coref_clusters
+    token_clusters = get_token_clusters(doc, char_clusters)
+    resolved_text, clusters = resolve_doc(doc, token_clusters)
+    replacements = get_replacements(clusters)
+
+    self.stats["docs"] += 1
+    self.stats["coref_seconds"] += coref_seconds
+    self.stats["fastcoref_seconds"] += fastcoref_seconds
+
+    return {
+      "resolved": resolved_text,
+      "clusters": clusters,
+      "replacements": replacements,
+      "cluster_matches": get_cluster_matches(resolved_text, replacements),
+      "ambiguated": replace_clusters(resolved_text, replacements),
+    }
+
+  def needs_coref(self, text:str) -> bool:
+    if not self.pronoun_gate:
+      return True
+    return self.pronoun_pattern.search(text) is not None
+
+  def needs_windows(self, text:str) -> bool:
+    if not self.window_size:
+      return False
+    return len(get_sentence_spans(text)) > self.window_size
+
+  def skip_doc(self, text:str) -> dict:
+    self.stats["docs"] += 1
+    self.stats["gated_docs"] += 1
+    return passthrough_coref(text)
+
+  def windowed_doc(self, text:str) -> dict:
+    # tag the whole text, but leave coref to the windows
+    doc = self.coref_resolution_model(text, disable=["fastcoref"])
+
+    t0 = time.perf_counter()
+    clusters = get_clusters_windowed(
+      text,
+      self.fast_coref_model,
+      window_size=self.window_size,
+      window_overlap=self.window_overlap
+    )
+    coref_seconds = time.perf_counter() - t0
+
+    self.stats["windowed_docs"] += 1
+    return self.process_doc(
+      doc,
+      coref_seconds,
+      char_clusters=list(clusters.values()),
+      fastcoref_seconds=coref_seconds
+    )
+
+  def unpiped_doc(self, text:str) -> dict:
+    if not self.needs_coref(text):
+      return self.skip_doc(text)
+    return self.windowed_doc(text)
+
+  def needs_pipe(self, text:str) -> bool:
+    return self.needs_coref(text) and not self.needs_windows(text)
+
+  def run_pipeline(self, texts:list) -> tuple:
+    """
+    runs coref_resolution_model over a batch of texts one component at a time, as its pipe does,
+      so the fastcoref component can be timed on its own
+    returns a tuple
+      tuple[0] = list of docs, in input order
+      tuple[1] = seconds spent in the fastcoref component
+    """
+    if not texts:
+      return list(), 0.0
+
+    docs = [self.coref_resolution_model.make_doc(text) for text in texts]
+    fastcoref_seconds = 0.0
+    for name, component in self.coref_resolution_model.pipeline:
+      t0 = time.perf_counter()
+      if hasattr(component, "pipe"):
+        docs = list(component.pipe(docs, batch_size=max(len(docs), 1)))
+      else:
+        docs = [component(doc) for doc in docs]
+      if name == "fastcoref":
+        fastcoref_seconds += time.perf_counter() - t0
+    return docs, fastcoref_seconds
+
+  def __call__(self, text:str) -> dict:
+    if not self.needs_pipe(text):
+      return self.unpiped_doc(text)
+
+    t0 = time.perf_counter()
+    docs, fastcoref_seconds = self.run_pipeline([text])
+    return self.process_doc(docs[0], time.perf_counter() - t0, fastcoref_seconds=fastcoref_seconds)
+
+  def pipe(self, texts, batch_size:int=32, n_process:int=1):
+    """
+    yields the coref stage output for each text, in input order
+      texts is streamed in batches of batch_size,
+      or through one coref_resolution_model.pipe call when n_process > 1
+    """
+    if n_process > 1:
+      yield from self.pipe_processes(texts, batch_size, n_process)
+      return
+
+    texts = iter(texts)
+    for batch in iter(lambda: list(islice(texts, batch_size)), []):
+      need = [self.needs_pipe(text) for text in batch]
+      t0 = time.perf_counter()
+      docs, fastcoref_seconds = self.run_pipeline([text for text, n in zip(batch, need) if n])
+      self.stats["coref_seconds"] += time.perf_counter() - t0
+      self.stats["fastcoref_seconds"] += fastcoref_seconds
+
+      docs = iter(docs)
+      for text, n in zip(batch, need):
+        yield self.process_doc(next(docs)) if n else self.unpiped_doc(text)
+
+  def pipe_processes(self, texts, batch_size:int, n_process:int):
+    """
+    pipe over n_process spaCy worker processes, which run the components themselves,
+      so the fastcoref component isn't timed on its own
+    """
+    # texts read by the spaCy pipe but not yielded yet, with whether they need coref
+    pending = deque()
+
+    def coref_texts():
+      for text in texts:
+        need = self.needs_pipe(text)
+        pending.append((text, need))
+        # gated and windowed texts send an empty placeholder through the pipe,
+        #   so spaCy's batching bounds how far ahead of the output it reads
+        yield text if need else ""
+
+    docs = iter(self.coref_resolution_model.pipe(
+      coref_texts(),
+      batch_size=batch_size,
+      n_process=n_process
+    ))
+
+    while True:
+      t0 = time.perf_counter()
+      doc = next(docs, None)
+      coref_seconds = time.perf_counter() - t0
+      if doc is None:
+        break
+
+      text, need = pending.popleft()
+      if need:
+        yield self.process_doc(doc, coref_seconds)
+      else:
+        yield self.unpiped_doc(text)
+
+  def report(self) -> str:
+    return f"coref stage: {self.stats['docs']} docs "\
+      f"({self.stats['gated_docs']} skipped by the pronoun gate, "\
+      f"{self.stats['windowed_docs']} windowed), "\
+      f"{self.stats['coref_seconds']:.2f}s in coref, "\
+      f"{self.stats['fastcoref_seconds']:.2f}s of it in FCoref inference "\
+      f"(the second inference single-pass mode saves)"
+
+
+# default CorefStage of each coref_resolution_model, so its stats add up across calls
+default_coref_stages = WeakKeyDictionary()
+
+def get_coref_stage(coref_resolution_model) -> CorefStage:
+  """
+  shared CorefStage with the default settings, one per coref_resolution_model
+  """
+  try:
+    stage = default_coref_stages.get(coref_resolution_model)
+  except TypeError:
+    # models that can't be weakly referenced get a stage of their own
+    return CorefStage(coref_resolution_model)
+  if stage is None:
+    stage = CorefStage(coref_resolution_model)
+    default_coref_stages[coref_resolution_model] = stage
+  return stage
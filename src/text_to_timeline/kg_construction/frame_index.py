@@ -0,0 +1,155 @@
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+# bump whenever the artifact layout or the lemma normalization changes
+FRAME_INDEX_VERSION = 1
+DEFAULT_FRAME_INDEX_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "text_to_timeline", f"frame_index_v{FRAME_INDEX_VERSION}.json"
+)
+
+
+def normalize_lemma(lemma:str) -> str:
+    # WordNet joins multiword lemmas with underscores, FrameNet with spaces
+    return lemma.lower().replace(" ", "_")
+
+
+class FrameIndex:
+    """
+    Hash index from lemmas to the FrameNet frames with a lexical unit for them,
+        built once from the corpus instead of scanning every frame for each lookup
+        like framenet.frames_by_lemma.
+    Frames are numbered in framenet.frames() order, so the first frame of a lemma
+        is the one frames_by_lemma would list first.
+    """
+
+    def __init__(self, frame_names:list, lemma_frames:dict, source:str=None):
+        """
+        :param frame_names: Frame names, in FrameNet order.
+        :param lemma_frames: Maps each normalized lemma to the sorted ids of its frames.
+        :param source: Name of the FrameNet corpus the index was built from.
+        """
+        self.frame_names = list(frame_names)
+        self.lemma_frames = lemma_frames
+        self.source = source
+        # first frame of every lemma
+        self.first_frame = {lemma: frames[0] for lemma, frames in lemma_frames.items() if frames}
+
+    @classmethod
+    def build(cls, framenet=None):
+        """
+        Index every lexical unit of every frame, loading the whole corpus once.
+        """
+        if framenet is None:
+            from nltk.corpus import framenet
+        frame_names = list()
+        lemma_frames = dict()
+        for frame_id, frame in enumerate(framenet.frames()):
+            frame_names.append(frame.name)
+            for lu_name in frame.lexUnit:
+                frames = lemma_frames.setdefault(normalize_lemma(lu_name.rsplit(".", 1)[0]), [])
+                if not frames or frames[-1] != frame_id:
+                    frames.append(frame_id)
+        return cls(frame_names, lemma_frames, source=cls.corpus_name(framenet))
+
+    @staticmethod
+    def corpus_name(framenet) -> str:
+        return os.path.basename(str(getattr(framenet, "root", "")))
+
+    def save(self, path:str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "version": FRAME_INDEX_VERSION,
+                "source": self.source,
+                "frames": self.frame_names,
+                "lemmas": self.lemma_frames,
+            }, f)
+        # atomic, so concurrent builders can't leave a half-written artifact
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path:str, source:str=None):
+        """
+        :return: the saved index, or None if it's missing or from another version or corpus.
+        """
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != FRAME_INDEX_VERSION\
+        or (source is not None and data.get("source") != source):
+            return None
+        return cls(data["frames"], data["lemmas"], source=data["source"])
+
+    def frame_ids(self, lemma_lists:list) -> np.ndarray:
+        """
+        First frame id of each list of lemmas, or -1 if none of them has a frame.
+        """
+        n_lemmas = np.array([len(lemmas) for lemmas in lemma_lists], dtype=np.int64)
+        first = np.array([
+            self.first_frame.get(normalize_lemma(lemma), -1)
+            for lemmas in lemma_lists for lemma in lemmas
+        ], dtype=np.int64)
+        # missing lemmas sort after every frame
+        first[first < 0] = len(self.frame_names)
+
+        ids = np.full(len(lemma_lists), -1, dtype=np.int64)
+        has_lemmas = n_lemmas > 0
+        if has_lemmas.any():
+            starts = (np.cumsum(n_lemmas) - n_lemmas)[has_lemmas]
+            ids[has_lemmas] = np.minimum.reduceat(first, starts)
+        ids[ids == len(self.frame_names)] = -1
+        return ids
+
+    def frames_of_lemmas(self, lemma_lists:list) -> list:
+        """
+        :return: the first frame name for each list of lemmas, or None.
+        """
+        return [
+            self.frame_names[i] if i >= 0 else None
+            for i in self.frame_ids(lemma_lists).tolist()
+        ]
+
+    def frames_of_synsets(self, synset_names:list, wordnet=None) -> list:
+        """
+        Resolve the frame of every synset name in one pass over the index.
+        Names that aren't WordNet synsets are looked up as lemmas themselves.
+        """
+        from nltk.corpus.reader.wordnet import WordNetError
+
+        if wordnet is None:
+            from nltk.corpus import wordnet
+        lemma_lists = list()
+        for name in synset_names:
+            try:
+                lemma_lists.append([lemma.name() for lemma in wordnet.synset(name).lemmas()])
+            except (WordNetError, ValueError):
+                lemma_lists.append([str(name)])
+        return self.frames_of_lemmas(lemma_lists)
+
+    def __len__(self):
+        return len(self.lemma_frames)
+
+
+@lru_cache(maxsize=None)
+def get_frame_index(path:str=DEFAULT_FRAME_INDEX_PATH) -> FrameIndex:
+    """
+    Shared FrameIndex over nltk's FrameNet, loaded from path,
+        or built and saved there if there's no artifact for this version and corpus.
+    """
+    from nltk.corpus import framenet as fn
+
+    source = FrameIndex.corpus_name(fn)
+    index = FrameIndex.load(path, source=source)
+    if index is None:
+        index = FrameIndex.build()
+        try:
+            index.save(path)
+        except OSError as e:
+            print(f"Couldn't save the FrameNet index to {path}: {e}")
+    return index
@@ -1,9 +1,9 @@
-from spacy.symbols import VERB, AUX
-import spacy
 import networkx as nx
+from collections import OrderedDict, Counter
+from weakref import WeakKeyDictionary
 from typing import Optional, List, Tuple, Set
 
-from text_to_timeline.utils.utils import get_subtree_text
+from text_to_timeline.utils.utils import get_subtree_text, stable_id
 from .POSCategories import POSCategories
 
 def get_verb_conj_objs(verb):
@@ -161,8 +161,9 @@ def handle_complement_phrases(
                     and (obj in e[2]))]
 
     # add the nodes and edges to the associated lists
-    return [ccomp_obj] + comp_nodes,\
-            edges + comp_edges
+    edges.extend(comp_edges)
+    comp_nodes.insert(0, ccomp_obj)
+    return comp_nodes, edges
   
   # TODO: handle conjunctions
   # # if the child is a conjunction, recurse on the conjunction
@@ -249,8 +250,9 @@ def get_subj_dobj(
         pred_tok=verb_root
       )
       if addtl_iobj_nodes is not None and complement_edges is not None:
-        return ind_obj_nodes + addtl_iobj_nodes,\
-                edges + complement_edges
+        ind_obj_nodes.extend(addtl_iobj_nodes)
+        edges.extend(complement_edges)
+        return ind_obj_nodes, edges
 
     # if the verb root has no objects or complements,
     # the verb is probably intransitive and no additional relations can be extracted,
@@ -266,52 +268,115 @@ def get_subj_dobj(
   return None, None
 
 
-def get_edges(doc):
-  edges = list()
-  ind_obj_nodes = list()
-  verb_roots_checked = set()
-
-  # for each noun chunk
-  for token in doc:
-        # if the  parent of the noun chunk is a verb or auxiliary verb
-        if token.dep_ in {"ROOT"}\
-          and token.pos_ in {"VERB", "AUX"}:
-
-            # recurse on the children of the verb root
-            comp_nodes, comp_edges = get_subj_dobj(
-                token,
-                len(ind_obj_nodes)
-            )
+def iter_edges(doc, with_offsets:bool=False):
+  """
+  yields (subject, predicate, object) edges, one sentence root at a time
+    if with_offsets is True, each edge also carries the character offset of the verb root
+    it was extracted from, as a 4th element
+  """
+  # the number of indirect object nodes found so far, used to suffix placeholder nodes
+  n_ind_obj_nodes = 0
+
+  for sent in doc.sents:
+    token = sent.root
+    # if the root of the sentence is a verb or auxiliary verb
+    if token.dep_ in {"ROOT"}\
+      and token.pos_ in {"VERB", "AUX"}:
+
+        # recurse on the children of the verb root
+        comp_nodes, comp_edges = get_subj_dobj(
+            token,
+            n_ind_obj_nodes
+        )
+        if comp_edges is None:
+          continue
 
-            # add the nodes and edges to the associated lists
-            ind_obj_nodes = ind_obj_nodes + comp_nodes
-            edges = edges + comp_edges
+        n_ind_obj_nodes += len(comp_nodes)
+        for e in comp_edges:
+          yield (*e, token.idx) if with_offsets else e
 
-            verb_roots_checked.add(token.text)
 
-  return edges
+def get_edges(doc, with_offsets:bool=False):
+  """
+  returns a list of (subject, predicate, object) edges
+    see iter_edges
+  """
+  return list(iter_edges(doc, with_offsets=with_offsets))
 
 
 class SplitTriplets:
 
     def __init__(self,
         subj_edge_label:str="subject",
-        obj_edge_label:str="object"):
+        obj_edge_label:str="object",
+        doc_cache_size:int=4096):
         
         self.subj_edge_label = subj_edge_label
         self.obj_edge_label = obj_edge_label
         self.pos_categories = POSCategories()
 
+        # LRU caches of parsed chunks, one per nlp_model,
+        #   held weakly so a collected model's docs can't be served to a new one
+        self.doc_cache_size = doc_cache_size
+        self.doc_caches = WeakKeyDictionary()
+
+    def model_cache(self, nlp_model) -> OrderedDict:
+      try:
+        return self.doc_caches.setdefault(nlp_model, OrderedDict())
+      except TypeError:
+        # models that can't be weakly referenced aren't cached
+        return OrderedDict()
+
+    def cache_doc(self, cache:OrderedDict, chunk:str, doc):
+      cache[chunk] = doc
+      cache.move_to_end(chunk)
+      while len(cache) > self.doc_cache_size:
+        cache.popitem(last=False)
+
+    def get_doc(self, chunk:str, nlp_model):
+      cache = self.model_cache(nlp_model)
+      if chunk in cache:
+        cache.move_to_end(chunk)
+        return cache[chunk]
+
+      doc = nlp_model(chunk)
+      self.cache_doc(cache, chunk, doc)
+      return doc
+
+    def parse_chunks(self, chunks, nlp_model) -> dict:
+      """
+      parses the unique chunks with a single nlp_model.pipe call,
+        reusing any docs already in the cache
+      returns a dict mapping each chunk to its doc
+      """
+      cache = self.model_cache(nlp_model)
+      docs = dict()
+      to_parse = list()
+      for chunk in dict.fromkeys(c for c in chunks if c is not None):
+        if chunk in cache:
+          cache.move_to_end(chunk)
+          docs[chunk] = cache[chunk]
+        else:
+          to_parse.append(chunk)
+
+      for chunk, doc in zip(to_parse, nlp_model.pipe(to_parse)):
+        docs[chunk] = doc
+        self.cache_doc(cache, chunk, doc)
+
+      return docs
+
     def get_node_subgraph(
         self,
         chunk:str,
         nlp_model,
-        event_id:int=None):
+        event_id:int=None,
+        doc=None):
 
       root = None
-      id = event_id if event_id else int(str(hash(chunk))[:10])
+      id = event_id if event_id is not None else stable_id(chunk)
       chunk_graph = nx.DiGraph()
-      doc = nlp_model(chunk)
+      if doc is None:
+        doc = self.get_doc(chunk, nlp_model)
 
       # print(f"entities: {doc.ents}")
       entity = doc.ents[0] if len(doc.ents) > 0 else None
@@ -355,6 +420,9 @@ class SplitTriplets:
         print(f"chunk pos: {doc[0].pos_}")
         raise ValueError("No root node found or not implemented.")
 
+      # keep the POS tags on the nodes, so NodeWSD doesn't have to parse them again
+      chunk_graph.add_node(root, pos=root_type)
+
       # add other words' dependencies to the graph
       for word in doc:
         if word.text not in root:
@@ -366,6 +434,9 @@ class SplitTriplets:
             chunk_graph.add_edge(root, word.text, labels="quantifiers.owl: hasDeterminer")
           elif word.pos_ in self.pos_categories.quantifier_types:
             chunk_graph.add_edge(root, word.text, labels="quantifiers.owl: hasQuantity")
+          else:
+            continue
+          chunk_graph.nodes[word.text]["pos"] = word.pos_
 
       return root, chunk_graph, root_type
 
@@ -374,13 +445,17 @@ class SplitTriplets:
         self,
         e,
         nlp_model,
-        event_id:int=None):
+        event_id:int=None,
+        docs:dict=None):
       node_subgraphs = nx.DiGraph()
+      if docs is None:
+        docs = dict()
 
       # get subgraph for the subject's noun chunk
       subj, subj_subgraph, subj_type = self.get_node_subgraph(
           e[0],
-          nlp_model
+          nlp_model,
+          doc=docs.get(e[0])
       )
       node_subgraphs.update(subj_subgraph)
 
@@ -388,7 +463,8 @@ class SplitTriplets:
       pred, pred_subgraph, pred_type = self.get_node_subgraph(
           e[1],
           nlp_model,
-          event_id=event_id
+          event_id=event_id,
+          doc=docs.get(e[1])
       )
       node_subgraphs.update(pred_subgraph)
 
@@ -396,6 +472,7 @@ class SplitTriplets:
       obj, obj_subgraph, obj_type = self.get_node_subgraph(
           e[2],
           nlp_model,
+          doc=docs.get(e[2])
       )
 
 
@@ -425,10 +502,21 @@ class SplitTriplets:
       noun_nodes = set()
       new_event_seq = list()
 
-      for i, e in enumerate(event_triples):
-        subj, event_root, obj, node_subgraphs = self.get_triple_subgraph(e, nlp_model, i)
+      # parse every unique chunk up front, in one batch
+      docs = self.parse_chunks(
+        (chunk for e in event_triples for chunk in e[:3]),
+        nlp_model
+      )
+
+      # number repeated triples, so each event gets its own content-derived id
+      occurrences = Counter()
+
+      for e in event_triples:
+        event_id = stable_id(*e[:3], occurrences[tuple(e[:3])])
+        occurrences[tuple(e[:3])] += 1
+        subj, event_root, obj, node_subgraphs = self.get_triple_subgraph(e, nlp_model, event_id, docs=docs)
         # add the event root (predicate) to the event sequence
-        #   since a unique id is appended to each predicate node's label,
+        #   since a unique, deterministic id is appended to each predicate node's label,
         #   there should be no confusion for repeated actions/verbs
         new_event_seq.append(event_root)
         # add the noun nodes to the list
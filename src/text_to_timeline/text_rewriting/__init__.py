@@ -1,3 +1,8 @@
 """Text Rewriting Module"""
 
-from .clause_simplification import *
\ No newline at end of file
+from ..utils import lazy_imports
+
+# submodules are imported on first use, see utils/lazy_imports.py
+lazy_imports.lazy_package(__name__, {
+    "clause_simplification": ["simplify_made_it"],
+})
@@ -1,10 +1,10 @@
-from spacy.matcher import Matcher
-import pyinflect
-import spacy
-from spacy.tokens import Doc, Token
+from text_to_timeline.utils.utils import clear_subtree_text_memo
 
 
 def simplify_made_it(doc, matcher):
+    # registers the Token._.inflect extension
+    import pyinflect
+
     matches = matcher(doc)
     # Sort so inner spans get merged first
     matches = sorted(matches, key=lambda m: (m[1], -m[2]))
@@ -25,4 +25,7 @@ def simplify_made_it(doc, matcher):
                 "TAG": "VBN"
             }
             retok.merge(span, attrs=attrs)
+    if matches:
+        # token indices changed, so memoized subtree texts are stale
+        clear_subtree_text_memo(doc)
     return doc
\ No newline at end of file
@@ -1,14 +1,135 @@
+import numpy as np
+
+
 # Disjoint-set (Union-Find) for merging boundary nodes
+#   iterative find with path compression, union by size
 class DSU:
     def __init__(self):
         self.parent = {}
+        self.size = {}
 
     def find(self, x):
-        if self.parent.setdefault(x, x) != x:
-            self.parent[x] = self.find(self.parent[x])
-        return self.parent[x]
+        parent = self.parent
+        if x not in parent:
+            parent[x] = x
+            self.size[x] = 1
+            return x
+
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        # path compression
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
 
     def union(self, x, y):
         rx, ry = self.find(x), self.find(y)
-        if rx != ry:
-            self.parent[ry] = rx
\ No newline at end of file
+        if rx == ry:
+            return rx
+        # attach the smaller tree under the larger one
+        if self.size[rx] < self.size[ry]:
+            rx, ry = ry, rx
+        self.parent[ry] = rx
+        self.size[rx] += self.size[ry]
+        return rx
+
+    def union_many(self, pairs):
+        for x, y in pairs:
+            self.union(x, y)
+
+    def find_many(self, xs) -> list:
+        return [self.find(x) for x in xs]
+
+    def components(self) -> dict:
+        """
+        Map each representative to the list of its members.
+        """
+        groups = {}
+        for x in self.parent:
+            groups.setdefault(self.find(x), []).append(x)
+        return groups
+
+
+# Disjoint-set over the integers 0..n-1, backed by NumPy arrays
+class ArrayDSU:
+    def __init__(self, n:int):
+        self.parent = np.arange(n)
+        self.size = np.ones(n, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.parent)
+
+    def find(self, x:int) -> int:
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        # path compression
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return int(root)
+
+    def union(self, x:int, y:int) -> int:
+        rx, ry = self.find(x), self.find(y)
+        if rx == ry:
+            return rx
+        # attach the smaller tree under the larger one
+        if self.size[rx] < self.size[ry]:
+            rx, ry = ry, rx
+        self.parent[ry] = rx
+        self.size[rx] += self.size[ry]
+        return rx
+
+    def union_many(self, xs, ys):
+        """
+        Union every (xs[i], ys[i]) pair at once: hook the larger root of each pair
+            under the smaller one with np.minimum.at, flatten with pointer jumping,
+            and repeat until every pair shares a root.
+        """
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        if not len(xs):
+            return
+        parent = self.roots()
+        while True:
+            rx, ry = parent[xs], parent[ys]
+            differ = rx != ry
+            if not differ.any():
+                break
+            rx, ry = rx[differ], ry[differ]
+            # roots only ever point to smaller roots, so hooking can't make cycles
+            np.minimum.at(parent, np.maximum(rx, ry), np.minimum(rx, ry))
+            while True:
+                grandparent = parent[parent]
+                if np.array_equal(grandparent, parent):
+                    break
+                parent = grandparent
+            xs, ys = xs[differ], ys[differ]
+        self.parent = parent
+        self.size = np.bincount(parent, minlength=len(parent))
+
+    def roots(self) -> np.ndarray:
+        """
+        Flatten every tree with vectorized pointer jumping.
+        :return: array mapping each element to its representative.
+        """
+        parent = self.parent
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+        self.parent = parent
+        return parent
+
+    def find_many(self, xs) -> np.ndarray:
+        return self.roots()[np.asarray(xs)]
+
+    def components(self) -> tuple:
+        """
+        :return: (labels, n_components), where labels maps each element
+            to a component index in 0..n_components-1.
+        """
+        _, labels = np.unique(self.roots(), return_inverse=True)
+        return labels, int(labels.max()) + 1 if len(labels) else 0
@@ -2,11 +2,23 @@ from .BoundaryNode import BoundaryNode
 
 # Event with potential children (containment)
 class Event:
+    __slots__ = ('id', 'start', 'end', '_children')
+
     def __init__(self, id):
         self.id = id
         self.start = BoundaryNode(self, 'start')
         self.end = BoundaryNode(self, 'end')
-        self.children = []
+        # most events contain no others, so the list is only created by add_child
+        self._children = None
+
+    @property
+    def children(self):
+        return self._children if self._children is not None else ()
+
+    def add_child(self, child):
+        if self._children is None:
+            self._children = []
+        self._children.append(child)
 
     # assumes each event has a unique id
     def __eq__(self, other):
@@ -17,4 +29,4 @@ class Event:
         return hash(self.id)
 
     def __str__(self):
-        return f"{self.id}"
\ No newline at end of file
+        return f"{self.id}"
@@ -0,0 +1,211 @@
+from intervaltree import Interval, IntervalTree
+
+from .DSU import DSU
+from .Event import Event
+from .relation_table import get_relation_table
+
+
+class Timeline:
+    """
+    Stateful timeline that can be extended with new relations without a full rebuild.
+    Boundaries are unified with a DSU as in get_timeline, and the boundary DAG keeps
+        a dynamic topological order (Pearce-Kelly), so adding an edge only reorders
+        the boundaries between its endpoints and only their events' intervals are patched.
+    Times are topological labels, so they respect the same constraints as get_timeline's,
+        but unlike get_timeline there are no global start/end boundaries.
+    """
+
+    def __init__(self,
+                 rel_pos_tags:list,
+                 temporal_predicates_map:dict,
+                 temporal_relations_map:dict,
+                 prefix:str):
+        self.rel_pos_tags = rel_pos_tags
+        self.temporal_predicates_map = temporal_predicates_map
+        self.temporal_relations_map = temporal_relations_map
+        self.prefix = prefix
+        self.table = get_relation_table(
+            rel_pos_tags,
+            temporal_predicates_map,
+            temporal_relations_map,
+            prefix
+        )
+
+        self.events = {}
+        self.dsu = DSU()
+        # boundary DAG over DSU representatives
+        self.succ = {}
+        self.pred = {}
+        # topological label of each representative
+        self.ord = {}
+        self.next_label = 0
+        # boundaries merged into each representative
+        self.members = {}
+
+        self.tree = IntervalTree()
+        self.intervals = {}
+        # representatives whose label or members changed since the intervals were last patched
+        self._touched = set()
+
+    @classmethod
+    def from_event_seq(cls,
+                       event_seq:list,
+                       rel_pos_tags:list,
+                       temporal_predicates_map:dict,
+                       temporal_relations_map:dict,
+                       prefix:str):
+        timeline = cls(rel_pos_tags, temporal_predicates_map, temporal_relations_map, prefix)
+        timeline.add_relations(event_seq)
+        return timeline
+
+    def add_relations(self, event_seq:list) -> set:
+        """
+        Add (event, relation, event) triples to the timeline.
+        Raises a ValueError if a relation would make the constraints cyclic;
+            relations earlier in event_seq are kept.
+        :return: The set of events whose intervals were added or changed.
+        """
+        try:
+            for t1, rel_name, t2 in event_seq:
+                e1, e2 = self._get_event(t1), self._get_event(t2)
+                for offset, tag in self.table[rel_name]:
+                    self._apply_tag(tag, e1.end if offset else e1.start, e2)
+        finally:
+            changed = self._patch_intervals()
+        return changed
+
+    def _get_event(self, name) -> Event:
+        if name not in self.events:
+            event = Event(name)
+            self.events[name] = event
+            for boundary in (event.start, event.end):
+                self.dsu.find(boundary)
+                self.succ[boundary] = set()
+                self.pred[boundary] = set()
+                self.members[boundary] = [boundary]
+                self.ord[boundary] = self.next_label
+                self.next_label += 1
+                self._touched.add(boundary)
+            # Ensure each event.start precedes event.end
+            self._add_edge(event.start, event.end)
+        return self.events[name]
+
+    # Apply a single rel_pos_tag between a source boundary and a target event, as apply_tag does
+    def _apply_tag(self, tag, source, target_event):
+        rel, boundRef = tag
+        target = target_event.start if boundRef == 'start' else target_event.end
+
+        if rel == 'sameTimeAs':
+            self._merge(source, target)
+        elif rel == 'before':
+            self._add_edge(source, target)
+        elif rel == 'after':
+            self._add_edge(target, source)
+        elif rel == 'during':
+            if source.kind == 'start':
+                self._add_edge(target_event.start, source)
+                target_event.add_child(source.event)
+            else:
+                self._add_edge(source, target_event.end)
+        else:
+            raise ValueError(f"Unknown relation {rel}")
+
+    def _add_edge(self, u, v):
+        u, v = self.dsu.find(u), self.dsu.find(v)
+        if u == v or v in self.succ[u]:
+            return
+        if self.ord[u] > self.ord[v]:
+            self._reorder(u, v)
+        self.succ[u].add(v)
+        self.pred[v].add(u)
+
+    def _reorder(self, u, v):
+        """
+        Pearce-Kelly: restore the topological order for a new edge u -> v with ord[u] > ord[v],
+            by permuting the labels of the boundaries between v and u.
+        """
+        lower, upper = self.ord[v], self.ord[u]
+
+        # boundaries reachable from v that are currently ordered before u
+        forward = self._search(v, self.succ, lambda w: self.ord[w] <= upper)
+        if u in forward:
+            raise ValueError(f"Adding {u} -> {v} would create a cycle in the temporal constraints")
+        # boundaries that reach u and are currently ordered after v
+        backward = self._search(u, self.pred, lambda w: self.ord[w] >= lower)
+
+        nodes = sorted(backward, key=self.ord.get) + sorted(forward, key=self.ord.get)
+        labels = sorted(self.ord[n] for n in nodes)
+        for n, label in zip(nodes, labels):
+            self.ord[n] = label
+        self._touched.update(nodes)
+
+    @staticmethod
+    def _search(start, adjacency:dict, within) -> set:
+        seen = {start}
+        stack = [start]
+        while stack:
+            n = stack.pop()
+            for w in adjacency[n]:
+                if w not in seen and within(w):
+                    seen.add(w)
+                    stack.append(w)
+        return seen
+
+    def _merge(self, x, y):
+        x, y = self.dsu.find(x), self.dsu.find(y)
+        if x == y:
+            return
+
+        # merging is only consistent if neither boundary reaches the other through a third one
+        first, last = (x, y) if self.ord[x] < self.ord[y] else (y, x)
+        reachable = self._search(
+            first,
+            self.succ,
+            lambda w: self.ord[w] <= self.ord[last]
+        )
+        if any(last in self.succ[w] for w in reachable if w != first):
+            raise ValueError(f"Unifying {x} and {y} would create a cycle in the temporal constraints")
+
+        # detach the merged boundary, dropping any direct edge between the two
+        root = self.dsu.union(x, y)
+        other = y if root == x else x
+        out_edges = self.succ.pop(other) - {root}
+        in_edges = self.pred.pop(other) - {root}
+        for w in out_edges:
+            self.pred[w].discard(other)
+        for w in in_edges:
+            self.succ[w].discard(other)
+        self.succ[root].discard(other)
+        self.pred[root].discard(other)
+        del self.ord[other]
+        self.members[root].extend(self.members.pop(other))
+        self._touched.add(root)
+
+        # reattach its edges to the representative
+        for w in out_edges:
+            self._add_edge(root, w)
+        for w in in_edges:
+            self._add_edge(w, root)
+
+    def _patch_intervals(self) -> set:
+        """
+        Replace the intervals of every event with a touched boundary.
+        """
+        changed = set()
+        for rep in self._touched:
+            rep = self.dsu.find(rep)
+            for boundary in self.members[rep]:
+                boundary.time = self.ord[rep]
+                changed.add(boundary.event)
+        self._touched = set()
+
+        for event in changed:
+            interval = Interval(event.start.time, event.end.time, event)
+            old = self.intervals.get(event)
+            if old is not None:
+                if old == interval:
+                    continue
+                self.tree.remove(old)
+            self.tree.add(interval)
+            self.intervals[event] = interval
+        return changed
@@ -1,6 +1,25 @@
 """Timeline Construction Module"""
 
-from .BoundaryNode import *
-from .DSU import *
-from .Event import *
-from .timeline_construction import *
\ No newline at end of file
+from ..utils import lazy_imports
+
+# submodules are imported on first use, see utils/lazy_imports.py
+lazy_imports.lazy_package(__name__, {
+    "BoundaryNode": ["BoundaryNode"],
+    "DSU": ["DSU", "ArrayDSU"],
+    "Event": ["Event"],
+    "Timeline": ["Timeline"],
+    "allen_reasoner": [
+        "ALLEN_RELATIONS", "ALLEN_BITS", "ALL_RELATIONS", "N_MASKS", "RELATION_MASKS",
+        "allen_relation", "composition_tables", "compose", "mask_to_names", "AllenNetwork",
+    ],
+    "array_timeline": [
+        "intern_events", "collect_constraints", "topological_frontiers", "topological_times",
+        "get_timeline_arrays",
+    ],
+    "interval_store": ["IntervalStore"],
+    "reachability": ["rank_within_groups", "ReachabilityIndex"],
+    "relation_table": ["BOUNDARY_RELATIONS", "BOUNDARY_OFFSETS", "RelationTable", "get_relation_table"],
+    "timeline_construction": [
+        "apply_tag", "split_components", "combine_components", "split_store", "get_timeline",
+    ],
+})
@@ -0,0 +1,283 @@
+from functools import lru_cache
+from itertools import product
+
+import numpy as np
+
+from text_to_timeline.utils.utils import remove_rel_prefix
+
+# The 13 Allen interval relations, one bit each
+#   relation i's converse is relation 12 - i
+ALLEN_RELATIONS = [
+    "intervalBefore",
+    "intervalMeets",
+    "intervalOverlaps",
+    "intervalStarts",
+    "intervalDuring",
+    "intervalFinishes",
+    "intervalEquals",
+    "intervalFinishedBy",
+    "intervalContains",
+    "intervalStartedBy",
+    "intervalOverlappedBy",
+    "intervalMetBy",
+    "intervalAfter",
+]
+ALLEN_BITS = {name: 1 << i for i, name in enumerate(ALLEN_RELATIONS)}
+ALL_RELATIONS = (1 << len(ALLEN_RELATIONS)) - 1
+N_MASKS = ALL_RELATIONS + 1
+
+# Masks for every relation in maps/temporal_relations/allen_intervals.json
+RELATION_MASKS = dict(ALLEN_BITS)
+RELATION_MASKS.update({
+    # T1's start >= T2's start and T1's end <= T2's end
+    "intervalIn": ALLEN_BITS["intervalStarts"] | ALLEN_BITS["intervalDuring"]\
+                  | ALLEN_BITS["intervalFinishes"] | ALLEN_BITS["intervalEquals"],
+    "before": ALLEN_BITS["intervalBefore"],
+    "after": ALLEN_BITS["intervalAfter"],
+    "inside": ALLEN_BITS["intervalDuring"],
+    # start of T1 = start of T2
+    "hasBeginning": ALLEN_BITS["intervalStarts"] | ALLEN_BITS["intervalEquals"]\
+                    | ALLEN_BITS["intervalStartedBy"],
+    # end of T1 = end of T2
+    "hasEnd": ALLEN_BITS["intervalFinishes"] | ALLEN_BITS["intervalEquals"]\
+              | ALLEN_BITS["intervalFinishedBy"],
+})
+
+
+def allen_relation(a:tuple, b:tuple) -> int:
+    """
+    Index of the Allen relation between two concrete intervals (start, end).
+    """
+    (a1, a2), (b1, b2) = a, b
+    if a2 < b1:
+        return 0
+    if a2 == b1:
+        return 1
+    if b2 < a1:
+        return 12
+    if b2 == a1:
+        return 11
+    if a1 == b1 and a2 == b2:
+        return 6
+    if a1 == b1:
+        return 3 if a2 < b2 else 9
+    if a2 == b2:
+        return 5 if a1 > b1 else 7
+    if b1 < a1 and a2 < b2:
+        return 4
+    if a1 < b1 and b2 < a2:
+        return 8
+    return 2 if a1 < b1 else 10
+
+
+@lru_cache(maxsize=None)
+def composition_tables() -> tuple:
+    """
+    Precompute the composition of every pair of relation masks.
+    The full 8192 x 8192 table would take 128MB, so it's split on the first mask's bits:
+        compose(a, b) = low[a & 0x7F, b] | high[a >> 7, b]
+    :return: (low, high, converse), where converse maps each mask to its converse mask.
+    """
+    n = len(ALLEN_RELATIONS)
+
+    # base table for single relations, by enumerating every configuration of 3 intervals
+    #   (6 endpoints are enough to realize every configuration)
+    intervals = [(s, e) for s in range(6) for e in range(s + 1, 6)]
+    base = np.zeros((n, n), dtype=np.uint16)
+    for a, b, c in product(intervals, repeat=3):
+        base[allen_relation(a, b), allen_relation(b, c)] |= 1 << allen_relation(a, c)
+
+    # rows[i][b] = composition of relation i with mask b
+    masks = np.arange(N_MASKS)
+    rows = np.zeros((n, N_MASKS), dtype=np.uint16)
+    for i in range(n):
+        for j in range(n):
+            rows[i][(masks >> j) & 1 == 1] |= base[i, j]
+
+    def tables_for(bits:list) -> np.ndarray:
+        table = np.zeros((1 << len(bits), N_MASKS), dtype=np.uint16)
+        for a in range(1, 1 << len(bits)):
+            lowest = (a & -a).bit_length() - 1
+            table[a] = table[a & (a - 1)] | rows[bits[lowest]]
+        return table
+
+    low = tables_for(list(range(7)))
+    high = tables_for(list(range(7, n)))
+
+    converse = np.zeros(N_MASKS, dtype=np.uint16)
+    for i in range(n):
+        converse[(masks >> i) & 1 == 1] |= 1 << (n - 1 - i)
+
+    return low, high, converse
+
+
+def compose(a, b):
+    low, high, _ = composition_tables()
+    a = np.asarray(a)
+    return low[a & 0x7F, b] | high[a >> 7, b]
+
+
+def mask_to_names(mask:int) -> list:
+    return [name for name, bit in ALLEN_BITS.items() if mask & bit]
+
+
+class AllenNetwork:
+    """
+    Qualitative temporal network over the 13 Allen relations.
+    Constraints are stored as an n x n matrix of relation bitmasks,
+        and path consistency is run with vectorized compositions.
+    """
+
+    def __init__(self, events:list=None):
+        self.event_ids = dict()
+        self.matrix = np.zeros((0, 0), dtype=np.uint16)
+        self.inconsistencies = list()
+        self.unknown_relations = list()
+        for e in events or ():
+            self.add_event(e)
+
+    def add_event(self, event) -> int:
+        if event in self.event_ids:
+            return self.event_ids[event]
+
+        i = len(self.event_ids)
+        self.event_ids[event] = i
+        # grow the matrix geometrically, filling new pairs with the universal relation
+        if i >= len(self.matrix):
+            n = max(2 * len(self.matrix), 8)
+            matrix = np.full((n, n), ALL_RELATIONS, dtype=np.uint16)
+            matrix[:i, :i] = self.matrix[:i, :i]
+            self.matrix = matrix
+        self.matrix[i, i] = ALLEN_BITS["intervalEquals"]
+        return i
+
+    def add_relation(self, a, mask:int, b):
+        """
+        Intersect the constraint between events a and b with mask (and b, a with its converse).
+        """
+        _, _, converse = composition_tables()
+        i, j = self.add_event(a), self.add_event(b)
+        self.matrix[i, j] &= mask
+        self.matrix[j, i] &= converse[mask]
+        if self.matrix[i, j] == 0:
+            self.inconsistencies.append((a, b))
+
+    @classmethod
+    def from_event_seq(cls,
+                       event_seq:list,
+                       temporal_predicates_map:dict,
+                       prefix:str):
+        network = cls()
+        for t1, rel_name, t2 in event_seq:
+            cleaned_rel_name = remove_rel_prefix(rel_name, prefix)
+            if cleaned_rel_name not in RELATION_MASKS:
+                cleaned_rel_name = cleaned_rel_name.split(" ")[-1]
+                cleaned_rel_name = temporal_predicates_map.get(cleaned_rel_name, cleaned_rel_name)
+
+            mask = RELATION_MASKS.get(cleaned_rel_name)
+            if mask is None:
+                # leave the pair unconstrained, but keep track of it
+                network.unknown_relations.append((t1, rel_name, t2))
+                mask = ALL_RELATIONS
+            network.add_relation(t1, mask, t2)
+        return network
+
+    @property
+    def events(self) -> list:
+        return list(self.event_ids)
+
+    def path_consistency(self) -> bool:
+        """
+        Tighten every constraint with M[i, j] &= M[i, k] o M[k, j] until nothing changes.
+        For each k, rows are grouped by their constraint with k, so each group needs one
+            composition with row k, followed by a broadcast AND over the group's rows.
+        Only events whose constraints changed since they were last used as k are revisited.
+        :return: False if some constraint became empty, i.e. the network is inconsistent.
+        """
+        if self.inconsistencies:
+            return False
+
+        low, high, _ = composition_tables()
+        n = len(self.event_ids)
+        M = self.matrix[:n, :n]
+        dirty = np.ones(n, dtype=bool)
+
+        while dirty.any():
+            for k in np.flatnonzero(dirty):
+                if not dirty[k]:
+                    continue
+                dirty[k] = False
+
+                row = M[k]
+                # composing with the universal relation gives the universal relation
+                constrained = np.flatnonzero(M[:, k] != ALL_RELATIONS)
+                if constrained.size <= 1:
+                    continue
+
+                values = M[constrained, k]
+                for v in np.unique(values):
+                    comp = low[v & 0x7F, row] | high[v >> 7, row]
+                    # only columns where the composition says something can be tightened
+                    J = np.flatnonzero(comp != ALL_RELATIONS)
+                    if J.size == 0:
+                        continue
+                    I = constrained[values == v]
+
+                    # index columns directly when most of them are tightened
+                    dense = 2 * J.size > n
+                    if dense:
+                        J = np.arange(n)
+                        block = M[I]
+                        tightened = block & comp
+                    else:
+                        block = M[np.ix_(I, J)]
+                        tightened = block & comp[J]
+
+                    changed = tightened != block
+                    if not changed.any():
+                        continue
+
+                    if dense:
+                        M[I] = tightened
+                    else:
+                        M[np.ix_(I, J)] = tightened
+                    dirty[I[changed.any(axis=1)]] = True
+                    dirty[J[changed.any(axis=0)]] = True
+
+                    empty = np.argwhere(tightened == 0)
+                    if empty.size:
+                        events = self.events
+                        self.inconsistencies.extend(
+                            (events[I[r]], events[J[c]]) for r, c in empty
+                        )
+                        return False
+
+        return True
+
+    def relation(self, a, b) -> list:
+        return mask_to_names(int(self.matrix[self.event_ids[a], self.event_ids[b]]))
+
+    def tightest_constraints(self) -> list:
+        """
+        :return: list of (a, relation names, b) for every constrained pair, with a before b in event order.
+        """
+        n = len(self.event_ids)
+        M = self.matrix[:n, :n]
+        events = self.events
+        rows, cols = np.nonzero(np.triu(M != ALL_RELATIONS, k=1))
+        return [
+            (events[i], mask_to_names(int(M[i, j])), events[j])
+            for i, j in zip(rows.tolist(), cols.tolist())
+        ]
+
+    def report(self) -> str:
+        lines = [f"{len(self.event_ids)} events"]
+        if self.inconsistencies:
+            lines.append(f"inconsistent, {len(self.inconsistencies)} empty constraint(s):")
+            lines.extend(f"  {a} -- {b}" for a, b in self.inconsistencies[:10])
+        else:
+            lines.append("consistent")
+        if self.unknown_relations:
+            lines.append(f"{len(self.unknown_relations)} relation(s) not in the Allen maps, left unconstrained:")
+            lines.extend(f"  {r}" for r in self.unknown_relations[:10])
+        return "\n".join(lines)
@@ -0,0 +1,211 @@
+import numpy as np
+from intervaltree import Interval, IntervalTree
+
+from .DSU import ArrayDSU
+from .Event import Event
+from .interval_store import IntervalStore
+from .relation_table import get_relation_table
+
+# Array-backed constraint graph engine for get_timeline
+#   event i has boundary ids 2*i (start) and 2*i + 1 (end),
+#   followed by the global start and end boundaries
+
+
+def intern_events(event_seq:list) -> dict:
+    """
+    Map each event name to an integer id, in the same order get_timeline creates Events.
+    """
+    event_ids = dict()
+    for e in event_seq:
+        event_ids.setdefault(e[0], len(event_ids))
+    for e in event_seq:
+        event_ids.setdefault(e[2], len(event_ids))
+    return event_ids
+
+
+def collect_constraints(event_seq:list,
+                        event_ids:dict,
+                        rel_pos_tags:list,
+                        temporal_predicates_map:dict,
+                        temporal_relations_map:dict,
+                        prefix:str) -> tuple:
+    """
+    Apply each relation's rel_pos_tags, as apply_tag does, but to integer boundary ids.
+    :return: (src, dst, unions, children), where src/dst are parallel lists of
+        boundary ids, unions is a list of boundary id pairs to unify
+        and children maps an event id to the ids of the events it contains.
+    """
+    src, dst, unions = list(), list(), list()
+    children = dict()
+    table = get_relation_table(
+        rel_pos_tags,
+        temporal_predicates_map,
+        temporal_relations_map,
+        prefix
+    )
+
+    for t1, rel_name, t2 in event_seq:
+        e1, e2 = event_ids[t1], event_ids[t2]
+        for offset, (rel, boundRef) in table[rel_name]:
+            source = 2 * e1 + offset
+            target = 2 * e2 + (0 if boundRef == 'start' else 1)
+
+            if rel == 'sameTimeAs':
+                unions.append((source, target))
+            elif rel == 'before':
+                src.append(source)
+                dst.append(target)
+            elif rel == 'after':
+                src.append(target)
+                dst.append(source)
+            elif rel == 'during':
+                if offset == 0:
+                    src.append(2 * e2)
+                    dst.append(source)
+                    children.setdefault(e2, list()).append(e1)
+                else:
+                    src.append(source)
+                    dst.append(2 * e2 + 1)
+            else:
+                raise ValueError(f"Unknown relation {rel}")
+
+    return src, dst, unions, children
+
+
+def topological_frontiers(n_nodes:int, src:np.ndarray, dst:np.ndarray):
+    """
+    Kahn's algorithm over a CSR adjacency, one frontier of zero in-degree nodes at a time.
+    Only nodes with at least one edge are yielded; nodes on a cycle are never yielded.
+    """
+    order = np.argsort(src, kind='stable')
+    src, dst = src[order], dst[order]
+    indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n_nodes), out=indptr[1:])
+    indegree = np.bincount(dst, minlength=n_nodes)
+
+    present = np.zeros(n_nodes, dtype=bool)
+    present[src] = True
+    present[dst] = True
+
+    frontier = np.flatnonzero(present & (indegree == 0))
+    while frontier.size:
+        yield frontier
+
+        # gather the out-edges of the whole frontier
+        starts = indptr[frontier]
+        lengths = indptr[frontier + 1] - starts
+        total = lengths.sum()
+        if total == 0:
+            break
+        edge_idx = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+
+        targets, counts = np.unique(dst[edge_idx], return_counts=True)
+        indegree[targets] -= counts
+        frontier = targets[indegree[targets] == 0]
+
+
+def topological_times(n_nodes:int, src:np.ndarray, dst:np.ndarray) -> np.ndarray:
+    """
+    :return: array of topological indices, -1 for nodes with no edges or on a cycle.
+    """
+    times = np.full(n_nodes, -1, dtype=np.int64)
+    t = 0
+    for frontier in topological_frontiers(n_nodes, src, dst):
+        times[frontier] = np.arange(t, t + frontier.size)
+        t += frontier.size
+    return times
+
+
+def get_timeline_arrays(event_seq:list,
+                        rel_pos_tags:list,
+                        temporal_predicates_map:dict,
+                        temporal_relations_map:dict,
+                        prefix:str,
+                        output:str="tree"):
+    """
+    Array-backed equivalent of get_timeline.
+    Events and boundaries are interned to integer ids, constraints are stored as NumPy arrays,
+        and DSU collapsing and topological ordering run over those arrays.
+    :param output: "tree" for an IntervalTree of Events, or "columnar" for an IntervalStore,
+        which is built straight from the arrays.
+    """
+    event_ids = intern_events(event_seq)
+    n_events = len(event_ids)
+    n_boundaries = 2 * n_events + 2
+    global_start, global_end = 2 * n_events, 2 * n_events + 1
+
+    src, dst, unions, children = collect_constraints(
+        event_seq,
+        event_ids,
+        rel_pos_tags,
+        temporal_predicates_map,
+        temporal_relations_map,
+        prefix
+    )
+
+    # Ensure each event.start precedes event.end
+    starts = np.arange(n_events, dtype=np.int64) * 2
+    src = np.concatenate([np.asarray(src, dtype=np.int64), starts])
+    dst = np.concatenate([np.asarray(dst, dtype=np.int64), starts + 1])
+
+    # Add global boundaries
+    has_incoming = np.bincount(dst, minlength=n_boundaries) > 0
+    has_outgoing = np.bincount(src, minlength=n_boundaries) > 0
+    first_starts = starts[~has_incoming[starts]]
+    last_ends = starts[~has_outgoing[starts + 1]] + 1
+    src = np.concatenate([src, np.full(first_starts.size, global_start), last_ends])
+    dst = np.concatenate([dst, first_starts, np.full(last_ends.size, global_end)])
+
+    # Consolidate DSU: rebuild edges on representatives, dropping self-loops and duplicates
+    dsu = ArrayDSU(n_boundaries)
+    if unions:
+        dsu.union_many(*zip(*unions))
+    rep = dsu.roots()
+    rep_src, rep_dst = rep[src], rep[dst]
+    keep = rep_src != rep_dst
+    rep_edges = np.unique(rep_src[keep] * n_boundaries + rep_dst[keep])
+
+    times = topological_times(
+        n_boundaries,
+        rep_edges // n_boundaries,
+        rep_edges % n_boundaries
+    )[rep]
+
+    if (times[:2 * n_events] < 0).any():
+        raise ValueError(
+            f"{int((times[:2 * n_events] < 0).sum())} event boundaries could not be ordered, "
+            "the temporal constraints contain a cycle"
+        )
+
+    # Build pre-order on containment
+    has_parent = np.zeros(n_events, dtype=bool)
+    for c in children.values():
+        has_parent[c] = True
+
+    ordered = list()
+    visited = np.zeros(n_events, dtype=bool)
+    stack = list(np.flatnonzero(~has_parent)[::-1])
+    while stack:
+        e = stack.pop()
+        if visited[e]:
+            continue
+        visited[e] = True
+        ordered.append(e)
+        stack.extend(reversed(children.get(e, ())))
+
+    names = list(event_ids)
+    if output == "columnar":
+        ordered = np.asarray(ordered, dtype=np.int64)
+        return IntervalStore(times[2 * ordered], times[2 * ordered + 1], ordered, names)
+    elif output != "tree":
+        raise ValueError(f"Unknown output {output}")
+
+    # Build the IntervalTree in bulk, with the same Event payloads as get_timeline
+    intervals = list()
+    for e in ordered:
+        event = Event(names[e])
+        event.start.time = int(times[2 * e])
+        event.end.time = int(times[2 * e + 1])
+        intervals.append(Interval(event.start.time, event.end.time, event))
+
+    return IntervalTree(intervals)
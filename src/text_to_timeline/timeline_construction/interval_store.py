@@ -0,0 +1,124 @@
+import numpy as np
+from intervaltree import Interval, IntervalTree
+
+from .Event import Event
+
+
+class IntervalStore:
+    """
+    Columnar, immutable alternative to an IntervalTree of Events.
+    Intervals [begin, end) are stored as NumPy arrays sorted by (begin, end),
+        with event indices into a table of event names.
+    Queries binary search the sorted begins, and a running maximum of the ends
+        bounds how far back an interval can still reach the query.
+    """
+
+    def __init__(self, begin, end, event, names):
+        """
+        :param begin: Interval begins.
+        :param end: Interval ends, greater than the matching begins.
+        :param event: Index of each interval's event in names.
+        :param names: Table of event names.
+        """
+        begin = np.asarray(begin, dtype=np.int64)
+        end = np.asarray(end, dtype=np.int64)
+        event = np.asarray(event, dtype=np.int64)
+        if (end <= begin).any():
+            raise ValueError("IntervalStore doesn't support null intervals")
+
+        order = np.lexsort((event, end, begin))
+        self.begin = begin[order]
+        self.end = end[order]
+        self.event = event[order]
+        self.names = np.asarray(names, dtype=object)
+
+        self.max_end = np.maximum.accumulate(self.end) if len(self.end) else self.end
+        self.sorted_end = np.sort(self.end)
+
+    def __len__(self):
+        return len(self.begin)
+
+    @classmethod
+    def from_tree(cls, tree:IntervalTree):
+        """
+        Convert an IntervalTree with Event (or name) payloads.
+        """
+        names = dict()
+        begin, end, event = list(), list(), list()
+        for interval in tree:
+            name = interval.data.id if isinstance(interval.data, Event) else interval.data
+            begin.append(interval.begin)
+            end.append(interval.end)
+            event.append(names.setdefault(name, len(names)))
+        return cls(begin, end, event, list(names))
+
+    def to_tree(self) -> IntervalTree:
+        """
+        Convert to an IntervalTree with Event payloads, as get_timeline builds it.
+        """
+        intervals = list()
+        for begin, end, i in zip(self.begin.tolist(), self.end.tolist(), self.event.tolist()):
+            event = Event(self.names[i])
+            event.start.time = begin
+            event.end.time = end
+            intervals.append(Interval(begin, end, event))
+        return IntervalTree(intervals)
+
+    def event_names(self, rows) -> list:
+        return self.names[self.event[rows]].tolist()
+
+    def _candidates(self, begin, end) -> tuple:
+        # rows that start before end and whose running max end is past begin
+        lo = np.searchsorted(self.max_end, begin, side='right')
+        hi = np.searchsorted(self.begin, end, side='left')
+        return lo, hi
+
+    def at(self, point) -> np.ndarray:
+        """
+        :return: rows of the intervals containing point.
+        """
+        return self.overlap(point, point + 1)
+
+    def overlap(self, begin, end) -> np.ndarray:
+        """
+        :return: rows of the intervals overlapping [begin, end).
+        """
+        lo, hi = self._candidates(begin, end)
+        return lo + np.flatnonzero(self.end[lo:hi] > begin)
+
+    def envelop(self, begin, end) -> np.ndarray:
+        """
+        :return: rows of the intervals completely inside [begin, end).
+        """
+        lo = np.searchsorted(self.begin, begin, side='left')
+        hi = np.searchsorted(self.begin, end, side='left')
+        return lo + np.flatnonzero(self.end[lo:hi] <= end)
+
+    def count_at(self, points) -> np.ndarray:
+        """
+        Vectorized stabbing counts, for any number of points.
+        """
+        points = np.asarray(points)
+        return np.searchsorted(self.begin, points, side='right')\
+            - np.searchsorted(self.sorted_end, points, side='right')
+
+    def count_overlap(self, begins, ends) -> np.ndarray:
+        """
+        Vectorized overlap counts, for any number of [begin, end) ranges.
+        """
+        begins, ends = np.asarray(begins), np.asarray(ends)
+        return np.searchsorted(self.begin, ends, side='left')\
+            - np.searchsorted(self.sorted_end, begins, side='right')
+
+    def overlap_pairs(self, begins, ends) -> tuple:
+        """
+        Vectorized overlap query for many [begin, end) ranges.
+        :return: (query, row) arrays with one entry per overlapping interval.
+        """
+        begins, ends = np.asarray(begins), np.asarray(ends)
+        lo, hi = self._candidates(begins, ends)
+        lengths = np.maximum(hi - lo, 0)
+        query = np.repeat(np.arange(len(begins)), lengths)
+        row = np.repeat(lo - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        keep = self.end[row] > begins[query]
+        return query[keep], row[keep]
@@ -0,0 +1,307 @@
+import numpy as np
+
+from .DSU import ArrayDSU
+from .array_timeline import intern_events, collect_constraints, topological_frontiers
+
+
+def rank_within_groups(groups:np.ndarray) -> np.ndarray:
+    """
+    :return: rank of each element among the elements of its group, in order of appearance.
+    """
+    order = np.argsort(groups, kind='stable')
+    counts = np.bincount(groups)
+    ranks = np.empty(len(groups), dtype=np.int64)
+    ranks[order] = np.arange(len(groups)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return ranks
+
+
+def csr_edges(indptr:np.ndarray, nodes:np.ndarray) -> np.ndarray:
+    """
+    :return: indices of the CSR edges out of the given nodes.
+    """
+    starts = indptr[nodes]
+    lengths = indptr[nodes + 1] - starts
+    return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+
+class ReachabilityIndex:
+    """
+    Precedence queries over the partial order of event boundaries.
+    The boundary DAG is condensed on the DSU representatives and greedily covered with chains.
+    For every node and indexed chain of its component, reach holds the earliest position in that chain
+        reachable from the node, so node u reaches a node v on an indexed chain iff they're
+        in the same component and reach[u, chain[v]] <= chain_pos[v].
+    Only the max_chains longest chains of each component are indexed, so a component takes
+        at most n_nodes x max_chains int32s however wide its partial order is.
+        Queries for nodes off the indexed chains fall back to a search of the DAG,
+        pruned by topological level and batched per source (or target).
+    """
+
+    def __init__(self,
+                 event_ids:dict,
+                 node_of_boundary:np.ndarray,
+                 indptr:np.ndarray,
+                 indices:np.ndarray,
+                 comp:np.ndarray,
+                 chain:np.ndarray,
+                 chain_pos:np.ndarray,
+                 row_offset:np.ndarray,
+                 reach:np.ndarray,
+                 n_indexed:np.ndarray,
+                 level:np.ndarray,
+                 pred_indptr:np.ndarray,
+                 pred_indices:np.ndarray):
+        """
+        :param event_ids: Map from event name to event id; event i has boundaries 2*i (start) and 2*i + 1 (end).
+        :param node_of_boundary: Condensed DAG node of each boundary.
+        :param indptr: CSR offsets of the condensed DAG.
+        :param indices: CSR successors of the condensed DAG.
+        :param comp: Weakly connected component of each node.
+        :param chain: Chain of each node, numbered within its component from the longest.
+        :param chain_pos: Position of each node in its chain.
+        :param row_offset: Offset of each node's row in reach.
+        :param reach: Concatenated per-component blocks of earliest reachable chain positions.
+        :param n_indexed: Number of indexed chains (columns of reach) of each component.
+        :param level: Topological level of each node; edges always go to higher levels.
+        :param pred_indptr: CSR offsets of the reversed condensed DAG.
+        :param pred_indices: CSR predecessors of the condensed DAG.
+        """
+        self.event_ids = event_ids
+        self.event_names = np.array(list(event_ids), dtype=object)
+        self.node_of_boundary = node_of_boundary
+        self.indptr = indptr
+        self.indices = indices
+        self.comp = comp
+        self.chain = chain
+        self.chain_pos = chain_pos
+        self.row_offset = row_offset
+        self.reach = reach
+        self.n_indexed = n_indexed
+        self.level = level
+        self.pred_indptr = pred_indptr
+        self.pred_indices = pred_indices
+
+    @classmethod
+    def from_event_seq(cls,
+                       event_seq:list,
+                       rel_pos_tags:list,
+                       temporal_predicates_map:dict,
+                       temporal_relations_map:dict,
+                       prefix:str,
+                       max_chains:int=128):
+        """
+        :param max_chains: Maximum number of chains indexed per component.
+        """
+        event_ids = intern_events(event_seq)
+        n_events = len(event_ids)
+        src, dst, unions, _ = collect_constraints(
+            event_seq,
+            event_ids,
+            rel_pos_tags,
+            temporal_predicates_map,
+            temporal_relations_map,
+            prefix
+        )
+
+        # Ensure each event.start precedes event.end
+        starts = np.arange(n_events, dtype=np.int64) * 2
+        src = np.concatenate([np.asarray(src, dtype=np.int64), starts])
+        dst = np.concatenate([np.asarray(dst, dtype=np.int64), starts + 1])
+
+        # Condense the boundaries on their DSU representatives
+        dsu = ArrayDSU(2 * n_events)
+        if unions:
+            dsu.union_many(*zip(*unions))
+        _, node_of_boundary = np.unique(dsu.roots(), return_inverse=True)
+        n_nodes = int(node_of_boundary.max()) + 1 if n_events else 0
+
+        node_src, node_dst = node_of_boundary[src], node_of_boundary[dst]
+        keep = node_src != node_dst
+        edges = np.unique(node_src[keep] * n_nodes + node_dst[keep])
+        node_src, node_dst = edges // n_nodes, edges % n_nodes
+
+        # CSR adjacency, in both directions
+        indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(node_src, minlength=n_nodes), out=indptr[1:])
+        indices = node_dst
+        by_dst = np.argsort(node_dst, kind='stable')
+        pred_indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(node_dst, minlength=n_nodes), out=pred_indptr[1:])
+        pred_indices = node_src[by_dst]
+
+        # Topological order, with nodes that have no edges at the end
+        frontiers = list(topological_frontiers(n_nodes, node_src, node_dst))
+        topo = np.concatenate(frontiers) if frontiers else np.zeros(0, dtype=np.int64)
+        isolated = np.flatnonzero((np.diff(indptr) == 0) & (np.diff(pred_indptr) == 0))
+        if topo.size + isolated.size < n_nodes:
+            raise ValueError(
+                f"{n_nodes - topo.size - isolated.size} boundaries could not be ordered, "
+                "the temporal constraints contain a cycle"
+            )
+        topo = np.concatenate([topo, isolated])
+        level = np.zeros(n_nodes, dtype=np.int64)
+        for i, frontier in enumerate(frontiers):
+            level[frontier] = i
+
+        # Weakly connected components, each indexed in its own block
+        components = ArrayDSU(n_nodes)
+        components.union_many(node_src, node_dst)
+        comp, n_comps = components.components()
+
+        # Greedy chain cover: extend the chain of a predecessor that is still its chain's tail
+        chain = np.full(n_nodes, -1, dtype=np.int64)
+        chain_pos = np.zeros(n_nodes, dtype=np.int64)
+        tails = list()
+        lengths = list()
+        for v in topo.tolist():
+            for u in pred_indices[pred_indptr[v]:pred_indptr[v + 1]].tolist():
+                c = chain[u]
+                if tails[c] == u:
+                    break
+            else:
+                c = len(tails)
+                tails.append(None)
+                lengths.append(0)
+            chain[v] = c
+            chain_pos[v] = lengths[c]
+            tails[c] = v
+            lengths[c] += 1
+
+        # Renumber chains within their component, longest first
+        chain_comp = np.zeros(len(tails), dtype=np.int64)
+        chain_comp[chain] = comp
+        n_chains = np.bincount(chain_comp, minlength=n_comps)
+        by_length = np.lexsort((-np.asarray(lengths, dtype=np.int64), chain_comp))
+        local_chain = np.empty(len(tails), dtype=np.int64)
+        local_chain[by_length] = np.arange(len(tails)) - np.repeat(np.cumsum(n_chains) - n_chains, n_chains)
+        chain = local_chain[chain]
+        n_indexed = np.minimum(n_chains, max_chains)
+        indexed = chain < n_indexed[comp]
+        local_row = rank_within_groups(comp)
+
+        # Block of component c is an n_nodes(c) x n_indexed(c) matrix, stored row-major
+        block_sizes = np.bincount(comp, minlength=n_comps) * n_indexed
+        block_start = np.cumsum(block_sizes) - block_sizes
+        row_offset = block_start[comp] + local_row * n_indexed[comp]
+
+        # Propagate earliest reachable chain positions from the sinks up,
+        #   one level of nodes with the same height at a time
+        unreachable = np.iinfo(np.int32).max
+        reach = np.full(int(block_sizes.sum()), unreachable, dtype=np.int32)
+        reach[row_offset[indexed] + chain[indexed]] = chain_pos[indexed]
+        for height in topological_frontiers(n_nodes, node_dst, node_src):
+            # edges out of this level (edges are sorted by source), whose targets are all on lower levels
+            edge_idx = csr_edges(indptr, height)
+            if edge_idx.size == 0:
+                continue
+            u, v = node_src[edge_idx], indices[edge_idx]
+
+            # one element per edge and indexed chain of its component
+            widths = n_indexed[comp[u]]
+            edge = np.repeat(np.arange(u.size), widths)
+            column = np.arange(widths.sum()) - np.repeat(np.cumsum(widths) - widths, widths)
+            np.minimum.at(
+                reach,
+                row_offset[u][edge] + column,
+                reach[row_offset[v][edge] + column]
+            )
+
+        return cls(
+            event_ids, node_of_boundary, indptr, indices, comp, chain, chain_pos, row_offset, reach,
+            n_indexed, level, pred_indptr, pred_indices
+        )
+
+    def reaches(self, u, v) -> np.ndarray:
+        """
+        Vectorized reachability between condensed DAG nodes (every node reaches itself).
+        """
+        u, v = np.broadcast_arrays(np.asarray(u), np.asarray(v))
+        shape = u.shape
+        u, v = u.ravel(), v.ravel()
+        result = np.zeros(u.size, dtype=bool)
+
+        same = self.comp[u] == self.comp[v]
+        indexed = same & (self.chain[v] < self.n_indexed[self.comp[v]])
+        iu, iv = u[indexed], v[indexed]
+        result[indexed] = self.reach[self.row_offset[iu] + self.chain[iv]] <= self.chain_pos[iv]
+
+        searched = same & ~indexed
+        if searched.any():
+            result[searched] = self._search(u[searched], v[searched])
+        return result.reshape(shape)
+
+    def _search(self, u:np.ndarray, v:np.ndarray) -> np.ndarray:
+        """
+        Reachability by search, one pruned breadth-first search per distinct source,
+            or backwards per distinct target if there are fewer of those.
+        """
+        result = u == v
+        pending = ~result
+        u, v = u[pending], v[pending]
+        if len(np.unique(u)) <= len(np.unique(v)):
+            starts, goals, indptr, indices, level = u, v, self.indptr, self.indices, self.level
+        else:
+            starts, goals, indptr, indices, level = v, u, self.pred_indptr, self.pred_indices, -self.level
+
+        found = np.zeros(len(starts), dtype=bool)
+        order = np.argsort(starts, kind='stable')
+        for group in np.split(order, np.flatnonzero(np.diff(starts[order])) + 1):
+            group_goals = goals[group]
+            # levels only increase along the search, so nothing past the furthest goal can lead to one
+            bound = level[group_goals].max()
+            visited = np.zeros(len(level), dtype=bool)
+            frontier = starts[group[:1]]
+            while frontier.size:
+                frontier = frontier[level[frontier] < bound]
+                reached = np.unique(indices[csr_edges(indptr, frontier)])
+                frontier = reached[(level[reached] <= bound) & ~visited[reached]]
+                visited[frontier] = True
+            found[group] = visited[group_goals]
+
+        result[pending] = found
+        return result
+
+    def _nodes(self, events, kind:str) -> np.ndarray:
+        offset = 0 if kind == 'start' else 1
+        if isinstance(events, str):
+            return self.node_of_boundary[2 * self.event_ids[events] + offset]
+        ids = np.fromiter((self.event_ids[e] for e in events), dtype=np.int64)
+        return self.node_of_boundary[2 * ids + offset]
+
+    def precedes_many(self, a, b, strict:bool=False) -> np.ndarray:
+        """
+        Whether each event in a necessarily ends before the matching event in b starts.
+        :param strict: If False, an event that meets the other (a.end = b.start) also precedes it.
+        """
+        u, v = self._nodes(a, 'end'), self._nodes(b, 'start')
+        result = self.reaches(u, v)
+        if strict:
+            result &= u != v
+        return result
+
+    def precedes(self, a, b, strict:bool=False) -> bool:
+        return bool(self.precedes_many(a, b, strict=strict))
+
+    def concurrent(self, a, b) -> bool:
+        """
+        Whether neither event necessarily precedes the other, i.e. they may overlap.
+        """
+        return not (self.precedes(a, b) or self.precedes(b, a))
+
+    def between(self, a, b, strict:bool=False) -> list:
+        """
+        :return: names of every event that necessarily comes after a and before b.
+        """
+        starts = self.node_of_boundary[0::2]
+        ends = self.node_of_boundary[1::2]
+        a_end, b_start = self._nodes(a, 'end'), self._nodes(b, 'start')
+
+        after_a = self.reaches(np.full_like(starts, a_end), starts)
+        before_b = self.reaches(ends, np.full_like(ends, b_start))
+        if strict:
+            after_a &= starts != a_end
+            before_b &= ends != b_start
+
+        mask = after_a & before_b
+        mask[[self.event_ids[a], self.event_ids[b]]] = False
+        return self.event_names[mask].tolist()
@@ -0,0 +1,121 @@
+from functools import lru_cache
+from types import MappingProxyType
+
+from text_to_timeline.utils.utils import get_relation_indices
+
+BOUNDARY_RELATIONS = {'before', 'after', 'sameTimeAs', 'during'}
+BOUNDARY_OFFSETS = {'start': 0, 'end': 1}
+
+
+class RelationTable:
+    """
+    Immutable lookup from relation strings to boundary-constraint opcodes, compiled once from the maps.
+    An opcode (offset, tag) applies the rel_pos_tag tag to the source event's start (offset 0) or end (offset 1).
+    Every relation and predicate name is compiled with and without the prefix;
+        other strings are resolved like get_relation_indices the first time they're looked up.
+    """
+
+    def __init__(self,
+                 rel_pos_tags:list,
+                 temporal_predicates_map:dict,
+                 temporal_relations_map:dict,
+                 prefix:str):
+        """
+        Raises a ValueError if the maps reference relations, tags or indices that don't exist.
+        """
+        self.rel_pos_tags = [tuple(tag) for tag in rel_pos_tags]
+        self.temporal_predicates_map = temporal_predicates_map
+        self.temporal_relations_map = temporal_relations_map
+        self.prefix = prefix
+        self.validate()
+
+        opcodes = {
+            name: self.compile_indices(indices)
+            for name, indices in temporal_relations_map.items()
+        }
+        for predicate, name in temporal_predicates_map.items():
+            # relation names take precedence, as in get_relation_indices
+            opcodes.setdefault(predicate, opcodes[name])
+        for name in list(opcodes):
+            opcodes.setdefault(prefix + name, opcodes[name])
+
+        self.opcodes = MappingProxyType(opcodes)
+        # strings outside the compiled table, resolved on first lookup
+        self._resolved = dict()
+
+    def validate(self):
+        errors = list()
+        for i, (rel, boundRef) in enumerate(self.rel_pos_tags):
+            if rel not in BOUNDARY_RELATIONS:
+                errors.append(f"rel_pos_tags[{i}] has unknown relation {rel!r}")
+            if boundRef is not None and boundRef not in BOUNDARY_OFFSETS:
+                errors.append(f"rel_pos_tags[{i}] has unknown boundary {boundRef!r}")
+        for name, indices in self.temporal_relations_map.items():
+            for i in indices:
+                if i is not None and not 0 <= i < len(self.rel_pos_tags):
+                    errors.append(f"relation {name!r} references missing rel_pos_tags[{i}]")
+        for predicate, name in self.temporal_predicates_map.items():
+            if name not in self.temporal_relations_map:
+                errors.append(f"predicate {predicate!r} maps to undefined relation {name!r}")
+
+        if errors:
+            raise ValueError("Invalid temporal relation maps:\n  " + "\n  ".join(errors))
+
+    def compile_indices(self, indices:tuple) -> tuple:
+        return tuple(
+            (offset, self.rel_pos_tags[i])
+            for offset, i in enumerate(indices)
+            if i is not None
+        )
+
+    def __getitem__(self, rel_name:str) -> tuple:
+        try:
+            return self.opcodes[rel_name]
+        except KeyError:
+            pass
+
+        if rel_name not in self._resolved:
+            try:
+                indices = get_relation_indices(
+                    rel_name,
+                    self.prefix,
+                    self.temporal_predicates_map,
+                    self.temporal_relations_map
+                )
+            except KeyError:
+                raise KeyError(f"Unknown temporal relation {rel_name!r}") from None
+            self._resolved[rel_name] = self.compile_indices(indices)
+        return self._resolved[rel_name]
+
+    def __contains__(self, rel_name:str) -> bool:
+        try:
+            self[rel_name]
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self):
+        return len(self.opcodes)
+
+
+def get_relation_table(rel_pos_tags:list,
+                       temporal_predicates_map:dict,
+                       temporal_relations_map:dict,
+                       prefix:str) -> RelationTable:
+    """
+    Shared RelationTable for the maps, compiled once per distinct set of maps (and per process),
+        so repeated get_timeline calls and component batches reuse its opcodes and resolved strings.
+    """
+    return _cached_relation_table((
+        tuple(tuple(tag) for tag in rel_pos_tags),
+        tuple(temporal_predicates_map.items()),
+        tuple((name, tuple(indices)) for name, indices in temporal_relations_map.items()),
+        prefix
+    ))
+
+
+@lru_cache(maxsize=32)
+def _cached_relation_table(key:tuple) -> RelationTable:
+    # keyed on a frozen copy of the maps, so mutating them afterwards can't leave a stale table
+    rel_pos_tags, predicates, relations, prefix = key
+    return RelationTable(list(rel_pos_tags), dict(predicates), dict(relations), prefix)
@@ -1,11 +1,18 @@
 import json
 from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
 from intervaltree import IntervalTree
 
-from text_to_timeline.utils.utils import remove_rel_prefix
 from .DSU import DSU
 from .BoundaryNode import BoundaryNode
 from .Event import Event
+from .array_timeline import get_timeline_arrays
+from .allen_reasoner import AllenNetwork
+from .Timeline import Timeline
+from .interval_store import IntervalStore
+from .relation_table import get_relation_table
 
 # Apply a single rel_pos_tag between a source boundary and a target event
 def apply_tag(tag, source, target_event, graph, dsu):
@@ -30,7 +37,7 @@ def apply_tag(tag, source, target_event, graph, dsu):
         if source.kind == 'start':
             graph[target_event.start].add(source)
             # record containment
-            target_event.children.append(source.event)
+            target_event.add_child(source.event)
         else:
             graph[source].add(target_event.end)
 
@@ -38,11 +45,181 @@ def apply_tag(tag, source, target_event, graph, dsu):
         raise ValueError(f"Unknown relation {rel}")
 
 
+def split_components(event_seq:list) -> list:
+    """
+    Split the relations into the weakly connected components of their events,
+        in order of first appearance, since no constraint crosses components.
+    """
+    dsu = DSU()
+    for t1, _, t2 in event_seq:
+        dsu.union(t1, t2)
+
+    components = dict()
+    for e in event_seq:
+        components.setdefault(dsu.find(e[0]), []).append(e)
+    return list(components.values())
+
+
+def combine_components(stores:list) -> IntervalStore:
+    """
+    Lay the timelines of independent components out one after the other,
+        each offset past the end of the previous one.
+    """
+    begin, end, event, names = list(), list(), list(), list()
+    offset = 0
+    for store in stores:
+        begin.append(store.begin + offset)
+        end.append(store.end + offset)
+        event.append(store.event + len(names))
+        names.extend(store.names)
+        if len(store):
+            offset += int(store.end.max()) + 1
+
+    if not stores:
+        return IntervalStore([], [], [], [])
+    return IntervalStore(np.concatenate(begin), np.concatenate(end), np.concatenate(event), names)
+
+
+def split_store(store:IntervalStore, components:list) -> list:
+    """
+    Split the timeline of several components solved together into one timeline per component,
+        re-ranking each component's times from 1 so they don't depend on the other components.
+    """
+    component_of = dict()
+    for i, component in enumerate(components):
+        for t1, _, t2 in component:
+            component_of[t1] = i
+            component_of[t2] = i
+    comp = np.array([component_of[name] for name in store.names], dtype=np.int64)[store.event]
+
+    # dense rank of each time among the times of its component
+    n = len(store)
+    times = np.concatenate([store.begin, store.end])
+    scale = int(times.max()) + 1 if n else 1
+    keys = np.concatenate([comp, comp]) * scale + times
+    unique_keys, ranks = np.unique(keys, return_inverse=True)
+    first = np.searchsorted(unique_keys // scale, np.arange(len(components)))
+    ranks = ranks - first[np.concatenate([comp, comp])] + 1
+
+    order = np.argsort(comp, kind='stable')
+    bounds = np.searchsorted(comp[order], np.arange(len(components) + 1))
+    stores = list()
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        rows = order[lo:hi]
+        stores.append(IntervalStore(
+            ranks[rows],
+            ranks[n + rows],
+            np.arange(len(rows)),
+            store.names[store.event[rows]]
+        ))
+    return stores
+
+
+# Maps shared with the process pool's workers, set once per worker by its initializer
+#   (each worker compiles its RelationTable from them once, on its first batch)
+_component_maps = None
+
+def _init_component_worker(maps:tuple):
+    global _component_maps
+    _component_maps = maps
+
+def _component_timelines(components:list, engine:str, maps:tuple=None) -> list:
+    # solve a batch of components in one call, since most of them are small
+    store = get_timeline(
+        [e for component in components for e in component],
+        *(maps or _component_maps),
+        engine=engine,
+        output="columnar"
+    )
+    return split_store(store, components)
+
+
 def get_timeline(event_seq:list,
                  rel_pos_tags:set,
                  temporal_predicates_map:dict,
                  temporal_relations_map:dict,
-                 prefix:str) -> (IntervalTree, set):
+                 prefix:str,
+                 engine:str="graph",
+                 check_consistency:bool=False,
+                 output:str="tree",
+                 decompose:bool=False,
+                 n_process:int=1) -> (IntervalTree, set):
+    """
+    :param engine: "graph" to build the constraint graph from BoundaryNode objects,
+        or "array" to use the NumPy-backed engine in array_timeline.py,
+        which is much faster for large event sequences,
+        or "incremental" to build a Timeline and return its tree.
+        Use Timeline directly to keep adding relations afterwards.
+    :param check_consistency: Whether to run Allen path consistency over the full relations
+        before reducing them to boundary constraints, raising a ValueError if they're inconsistent.
+    :param output: "tree" for an IntervalTree of Events, or "columnar" for an IntervalStore.
+    :param decompose: Whether to solve each weakly connected component of events on its own,
+        laying the components out one after the other in order of first appearance.
+    :param n_process: Number of processes to solve batches of components on, when decompose is set.
+    """
+    if output not in ("tree", "columnar"):
+        raise ValueError(f"Unknown output {output}")
+    if engine not in ("graph", "array", "incremental"):
+        raise ValueError(f"Unknown engine {engine}")
+
+    if check_consistency:
+        network = AllenNetwork.from_event_seq(
+            event_seq,
+            temporal_predicates_map,
+            prefix
+        )
+        if not network.path_consistency():
+            raise ValueError(f"Inconsistent temporal relations\n{network.report()}")
+
+    if decompose:
+        components = split_components(event_seq)
+        maps = (rel_pos_tags, temporal_predicates_map, temporal_relations_map, prefix)
+
+        # batches of consecutive components with about the same number of relations
+        batch_size = max(1, len(event_seq) // (4 * n_process))
+        batches, batch, n_relations = list(), list(), 0
+        for component in components:
+            batch.append(component)
+            n_relations += len(component)
+            if n_relations >= batch_size:
+                batches.append(batch)
+                batch, n_relations = list(), 0
+        if batch:
+            batches.append(batch)
+
+        if n_process > 1:
+            with ProcessPoolExecutor(
+                n_process,
+                initializer=_init_component_worker,
+                initargs=(maps,)
+            ) as pool:
+                results = pool.map(partial(_component_timelines, engine=engine), batches)
+                stores = [store for result in results for store in result]
+        else:
+            stores = [store for b in batches for store in _component_timelines(b, engine, maps)]
+
+        store = combine_components(stores)
+        return store if output == "columnar" else store.to_tree()
+
+    if engine == "array":
+        return get_timeline_arrays(
+            event_seq,
+            rel_pos_tags,
+            temporal_predicates_map,
+            temporal_relations_map,
+            prefix,
+            output=output
+        )
+    elif engine == "incremental":
+        tree = Timeline.from_event_seq(
+            event_seq,
+            rel_pos_tags,
+            temporal_predicates_map,
+            temporal_relations_map,
+            prefix
+        ).tree
+        return IntervalStore.from_tree(tree) if output == "columnar" else tree
+
     # Cast the combined event triples to Event objects
     event_nodes = {e[0]: Event(e[0]) for e in event_seq}
     event_nodes.update({
@@ -50,6 +227,14 @@ def get_timeline(event_seq:list,
       if e[2] not in event_nodes.keys()
     })
 
+    # maps compiled once per set of maps, so each relation is a single lookup
+    table = get_relation_table(
+        rel_pos_tags,
+        temporal_predicates_map,
+        temporal_relations_map,
+        prefix
+    )
+
     # DSU for boundary unification
     dsu = DSU()
     # graph edges: boundary -> set(boundary)
@@ -60,31 +245,22 @@ def get_timeline(event_seq:list,
     # Process instant relations (single-boundary)
     for t1, rel_name, t2 in event_seq:
         e1, e2 = event_nodes[t1], event_nodes[t2]
-        # get the cleaned relation name
-        cleaned_rel_name = remove_rel_prefix(rel_name, prefix)
-        if cleaned_rel_name not in temporal_relations_map:
-            cleaned_rel_name = cleaned_rel_name.split(" ")[-1]
-            cleaned_rel_name = temporal_predicates_map.get(cleaned_rel_name, cleaned_rel_name)
-        # map the relation to indices
-        i_start, i_end = temporal_relations_map[cleaned_rel_name]
-        # start mapping
-        if i_start is not None:
-            tag = rel_pos_tags[i_start]
-            apply_tag(tag, e1.start, e2, graph, dsu)
-        # end mapping
-        if i_end is not None:
-            tag = rel_pos_tags[i_end]
-            apply_tag(tag, e1.end, e2, graph, dsu)
+        # apply the start and end mappings
+        for offset, tag in table[rel_name]:
+            apply_tag(tag, e1.end if offset else e1.start, e2, graph, dsu)
 
     # Ensure each event.start precedes event.end
     for e in event_nodes.values():
         graph[e.start].add(e.end)
 
+    # Index the boundaries that have at least one incoming constraint
+    has_incoming = {v for targets in graph.values() for v in targets}
+
     # Add global boundaries
     global_start = BoundaryNode(None, 'start')
     global_end = BoundaryNode(None, 'end')
     for e in event_nodes.values():
-        if not any(e.start in graph[src] for src in graph):
+        if e.start not in has_incoming:
             graph[global_start].add(e.start)
         if len(graph[e.end]) == 0:
             graph[e.end].add(global_end)
@@ -124,11 +300,17 @@ def get_timeline(event_seq:list,
     for node in topo:
         node.time = time
         time += 1
+    # boundaries merged into a representative share its time
+    for e in event_nodes.values():
+        e.start.time = dsu.find(e.start).time
+        e.end.time = dsu.find(e.end).time
 
     # Build pre-order on containment
+    #   index the events that are contained by some parent
+    has_parent = {c for parent in event_nodes.values() for c in parent.children}
     roots = [
         e for e in event_nodes.values()\
-        if not any(e in parent.children for parent in event_nodes.values())
+        if e not in has_parent
     ]
 
     ordered = []
@@ -146,4 +328,6 @@ def get_timeline(event_seq:list,
         # add interval [begin, end) with payload = the Event instance
         tree.addi(e.start.time, e.end.time, e)   # ← use library insertion :contentReference[oaicite:4]{index=4}
 
+    if output == "columnar":
+        return IntervalStore.from_tree(tree)
     return tree
\ No newline at end of file
@@ -1,4 +1,17 @@
 """Utility Functions Module"""
 
-from .pipeline import *
-from .utils import *
\ No newline at end of file
+from . import lazy_imports
+
+# submodules are imported on first use, see lazy_imports.py
+lazy_imports.lazy_package(__name__, {
+    "pipeline": [
+        "get_referent_from_cluster", "get_cluster_index", "get_inter_cluster_edges",
+        "get_doc_info", "get_text_info", "get_texts_info",
+    ],
+    "utils": [
+        "SUBTREE_DEP_TYPES_TO_EXCLUDE", "get_subtree_text", "clear_subtree_text_memo", "stable_id",
+        "plot_graph_from_edge_list", "murder_orphans", "complete_rel_from_partial_match", "add_rel_prefix", "remove_rel_prefix",
+        "get_relation_indices", "list_nodes", "list_triples", "print_interval_tree", "plot_interval_tree",
+    ],
+    "resources": ["prepare_resources"],
+})
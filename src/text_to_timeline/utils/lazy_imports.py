@@ -0,0 +1,55 @@
+import importlib
+import sys
+from types import ModuleType
+
+
+class LazyPackage(ModuleType):
+  """
+  Package whose exports are imported from their submodules on first access (PEP 562),
+    so importing the package doesn't load spaCy, NLTK, NumPy, etc. up front.
+  """
+
+  def __getattr__(self, name:str):
+    exports = self.__dict__.get("_lazy_exports", {})
+    if name in exports:
+      value = getattr(importlib.import_module(f"{self.__name__}.{exports[name]}"), name)
+    elif name in self.__dict__.get("_lazy_submodules", ()):
+      value = importlib.import_module(f"{self.__name__}.{name}")
+    else:
+      raise AttributeError(f"module {self.__name__!r} has no attribute {name!r}")
+    ModuleType.__setattr__(self, name, value)
+    return value
+
+  def __setattr__(self, name:str, value):
+    # importing a submodule binds it on its package,
+    #   which would shadow the export of the same name (ex: NodeWSD.NodeWSD)
+    if isinstance(value, ModuleType) and name in self.__dict__.get("_lazy_exports", {}):
+      return
+    ModuleType.__setattr__(self, name, value)
+
+  def __dir__(self):
+    return sorted(set(self.__dict__) | set(self.__all__))
+
+
+def lazy_package(package_name:str, exports:dict):
+  """
+  Export names from a package's submodules without importing them until they're used.
+  :param exports: Maps each submodule, relative to the package, to the names to export from it.
+    A submodule that is itself a lazy package may map to None, to re-export everything it exports.
+  """
+  package = sys.modules[package_name]
+  lazy_exports = dict()
+  for submodule, names in exports.items():
+    if names is None:
+      names = importlib.import_module(f"{package_name}.{submodule}").__all__
+    for name in names:
+      lazy_exports[name] = submodule
+
+  package.__class__ = LazyPackage
+  package._lazy_exports = lazy_exports
+  package._lazy_submodules = set(submodule.split(".")[0] for submodule in exports)
+  # keep `from package import *` working, importing everything it exports
+  package.__all__ = [
+    name for name, value in package.__dict__.items()
+    if not name.startswith("_") and not isinstance(value, ModuleType)
+  ] + [name for name in lazy_exports if name not in package.__dict__]
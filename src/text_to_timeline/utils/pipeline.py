@@ -1,70 +1,90 @@
+from collections import defaultdict
+from itertools import islice
+
 from text_to_timeline.text_rewriting.clause_simplification import simplify_made_it
 from text_to_timeline.kg_construction.triplet_extraction import get_edges
-from text_to_timeline.kg_construction.fastcoref_coref_resolution import resolve_text, ambiguate_text
+from text_to_timeline.kg_construction.fastcoref_coref_resolution import resolve_text, ambiguate_text,\
+  resolve_texts, ambiguate_texts, CorefStage, get_coref_stage
 
 def get_referent_from_cluster(cluster_members) -> str:
   return max(cluster_members, key=lambda x: len(x[2]))[2]
 
+def get_cluster_index(clusters:dict) -> tuple:
+  """
+  returns a tuple
+    tuple[0] = dict mapping each cluster's key to its referent
+    tuple[1] = inverted index mapping each (lower-cased) mention text to the keys of its clusters
+  """
+  referents = dict()
+  mention_index = defaultdict(list)
+  for c_key, c_members in clusters.items():
+    if not c_members:
+      continue
+    referents[c_key] = get_referent_from_cluster(c_members)
+    for _, _, text in c_members:
+      c_keys = mention_index[text.lower().strip()]
+      # members of a cluster are contiguous, so only the last key needs checking
+      if not c_keys or c_keys[-1] != c_key:
+        c_keys.append(c_key)
+
+  return referents, mention_index
+
+
 def get_inter_cluster_edges(edges:list, clusters:dict) -> list:
   
   # get a list of nodes that have the word "and" in them
-  nodes = set()
+  nodes = dict()
   for e in edges:
     if e[0] is not None and e[2] is not None:
-      if e[0] not in nodes\
-        and "and" in e[0].split(" "):
-        nodes.add(e[0])
-      if e[2] not in nodes\
-        and "and" in e[0].split(" "):
-        nodes.add(e[2])
-  
+      if "and" in e[0].split(" "):
+        nodes[e[0]] = None
+      if "and" in e[2].split(" "):
+        nodes[e[2]] = None
+
+  referents, mention_index = get_cluster_index(clusters)
+
   # for each node, split on " and "
   for node in nodes:
     members = node.split(" and ")
     for m in members:
-      for c_key, c_members in clusters.items():
-        # if a member is in a given cluster,
-        if m in c_members:
-          edges.append((
-              get_referent_from_cluster(c_members),
-              "member of",
-              node
-          ))
+      # if a member is in a given cluster,
+      for c_key in mention_index.get(m.strip(), ()):
+        edges.append((
+            referents[c_key],
+            "member of",
+            node
+        ))
   
   return edges
 
 
-def get_text_info(text:str,
-                   nlp_model,
-                   fastcoref_model,
-                   coref_resolution_model,
-                   matcher) -> dict:
+def get_doc_info(resolved_text:str,
+                 cluster_matches:dict,
+                 ambiguated_doc,
+                 matcher) -> dict:
+  """
+  builds the doc_info dict for a single document,
+    given the output of the coref stage and the parse of the ambiguated text
+  """
   doc_info = dict()
-  doc_info["disambiguated"] = resolve_text(
-    text,
-    coref_resolution_model=coref_resolution_model
-  )
-
-  # get clusters and their associated referents, ambiguated text
-  cluster_matches, ambiguated_text = ambiguate_text(
-    doc_info["disambiguated"],
-    fastcoref_model
-  )
+  doc_info["disambiguated"] = resolved_text
   doc_info["cluster_matches"] = cluster_matches
-  doc_info["ambiguated"] = ambiguated_text
-  
+  doc_info["ambiguated"] = ambiguated_doc.text
+
   ambiguated_doc = simplify_made_it(
-    nlp_model(ambiguated_text),
+    ambiguated_doc,
     matcher)
 
 
-  # get an edge list based on the ambiguated elements
-  edges = get_edges(ambiguated_doc)
+  # get an edge list based on the ambiguated elements,
+  #   along with the position in the text each edge was extracted from
+  edges = get_edges(ambiguated_doc, with_offsets=True)
+  edge_offsets = [e[3] for e in edges]
   doc_info["edges"] = list()
   # resolve references in the edges based on the longest element of the cluster
   for e in edges:
 
-    e_new = e
+    e_new = e[:3]
     if e_new[0] in cluster_matches:
       cluster = cluster_matches[e_new[0]]
       longest_string = get_referent_from_cluster(cluster)
@@ -86,18 +106,110 @@ def get_text_info(text:str,
       ) for e in doc_info["edges"]
   ]
 
-  # get the sequence of events in the text
-  events = {e for e in doc_info["edges"] if (e[0] is not None and ("CCOMP_" not in e[0]))}
+  # get the sequence of events in the text, ordered by their position in the text
+  #   (sorted is stable, so edges from the same verb root keep their extraction order)
   doc_info["event_seq"] = list()
-  for e in events:
-    for i, edge in enumerate(doc_info["edges"]):
-      if e == edge and e not in doc_info["event_seq"]:
-        doc_info["event_seq"].insert(i, e)
+  seen_events = set()
+  for _, e in sorted(zip(edge_offsets, doc_info["edges"]), key=lambda x: x[0]):
+    if e[0] is not None and ("CCOMP_" not in e[0]) and e not in seen_events:
+      seen_events.add(e)
+      doc_info["event_seq"].append(e)
   
   # get inter-cluster edges, for groups of entities
-  doc_info["edges"] += get_inter_cluster_edges(
+  doc_info["edges"] = get_inter_cluster_edges(
       doc_info["edges"],
       cluster_matches
   )
   
-  return doc_info
\ No newline at end of file
+  return doc_info
+
+
+def get_text_info(text:str,
+                   nlp_model,
+                   fastcoref_model,
+                   coref_resolution_model,
+                   matcher,
+                   coref_stage:CorefStage=None,
+                   single_pass:bool=True) -> dict:
+  if single_pass:
+    # resolve the text and get clusters and ambiguated text from one coref inference
+    if coref_stage is None:
+      # the model's shared default stage, so its stats add up across calls
+      coref_stage = get_coref_stage(coref_resolution_model)
+    coref = coref_stage(text)
+    resolved_text = coref["resolved"]
+    cluster_matches = coref["cluster_matches"]
+    ambiguated_text = coref["ambiguated"]
+
+  else:
+    resolved_text = resolve_text(
+      text,
+      coref_resolution_model=coref_resolution_model
+    )
+
+    # get clusters and their associated referents, ambiguated text
+    cluster_matches, ambiguated_text = ambiguate_text(
+      resolved_text,
+      fastcoref_model
+    )
+
+  return get_doc_info(
+    resolved_text,
+    cluster_matches,
+    nlp_model(ambiguated_text),
+    matcher
+  )
+
+
+def get_texts_info(texts,
+                   nlp_model,
+                   fastcoref_model,
+                   coref_resolution_model,
+                   matcher,
+                   batch_size:int=32,
+                   n_process:int=1,
+                   coref_stage:CorefStage=None,
+                   single_pass:bool=True):
+  """
+  corpus-level version of get_text_info
+    streams an iterable of texts through one coref pipe and one nlp_model.pipe,
+    letting spaCy do the batching (and start its worker processes only once),
+    yielding one doc_info dict per text, in input order
+  """
+  if single_pass:
+    if coref_stage is None:
+      coref_stage = get_coref_stage(coref_resolution_model)
+    corefs = (
+      (c["ambiguated"], (c["resolved"], c["cluster_matches"]))
+      for c in coref_stage.pipe(texts, batch_size=batch_size, n_process=n_process)
+    )
+
+  else:
+    resolved_texts = resolve_texts(
+      texts,
+      coref_resolution_model,
+      batch_size=batch_size,
+      n_process=n_process
+    )
+    corefs = (
+      (ambiguated_text, (resolved_text, cluster_matches))
+      for resolved_batch in iter(lambda: list(islice(resolved_texts, batch_size)), [])
+      # get clusters and ambiguated text for each batch with one coref inference
+      for resolved_text, (cluster_matches, ambiguated_text)
+        in zip(resolved_batch, ambiguate_texts(resolved_batch, fastcoref_model))
+    )
+
+  ambiguated_docs = nlp_model.pipe(
+    corefs,
+    as_tuples=True,
+    batch_size=batch_size,
+    n_process=n_process
+  )
+
+  for ambiguated_doc, (resolved_text, cluster_matches) in ambiguated_docs:
+    yield get_doc_info(
+      resolved_text,
+      cluster_matches,
+      ambiguated_doc,
+      matcher
+    )
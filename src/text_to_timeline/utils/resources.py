@@ -0,0 +1,45 @@
+NLTK_CORPORA = ("wordnet", "framenet_v17")
+SPACY_MODELS = ("en_core_web_sm",)
+
+
+def prepare_resources(
+    nltk_corpora:tuple=NLTK_CORPORA,
+    spacy_models:tuple=SPACY_MODELS,
+    download_dir:str=None,
+    frame_index_path:str=None,
+    quiet:bool=False
+  ):
+  """
+  One-time provisioning of the corpora, models and indices the package loads on first use,
+    so later runs (ex: in offline containers) never need the network.
+  Nothing is downloaded at import time.
+  :param download_dir: NLTK data directory, NLTK's default if None.
+  :param frame_index_path: Where to save the FrameNet lemma index, get_frame_index's default if None.
+  """
+  import nltk
+
+  if download_dir is not None and download_dir not in nltk.data.path:
+    nltk.data.path.append(download_dir)
+  for corpus in nltk_corpora:
+    try:
+      nltk.data.find(f"corpora/{corpus}")
+    except LookupError:
+      if not nltk.download(corpus, download_dir=download_dir, quiet=quiet, raise_on_error=True):
+        raise RuntimeError(f"Couldn't download the NLTK corpus {corpus}")
+
+  if spacy_models:
+    import spacy
+    from spacy.cli import download
+
+    for model in spacy_models:
+      if not spacy.util.is_package(model):
+        download(model)
+
+  if "framenet_v17" in nltk_corpora:
+    from text_to_timeline.kg_construction.frame_index import get_frame_index
+
+    # build and save the lemma -> frame index now, instead of on the first EdgeFD
+    if frame_index_path is None:
+      get_frame_index()
+    else:
+      get_frame_index(frame_index_path)
@@ -1,20 +1,67 @@
+import hashlib
 import networkx as nx
-import matplotlib.pyplot as plt
 from intervaltree import IntervalTree
 
 
+SUBTREE_DEP_TYPES_TO_EXCLUDE = {"punct", "mark"}
+
+
 def get_subtree_text(token, exclude=list()):
-  dep_types_to_exclude = [
-      "punct", "mark"
-  ]
-  lefts = [get_subtree_text(t) for t in token.lefts\
-           if (t not in exclude)\
-            and (t.dep_ not in dep_types_to_exclude)]
-  rights = [get_subtree_text(t) for t in token.rights\
-           if (t not in exclude)\
-            and (t.dep_ not in dep_types_to_exclude)]
-  tokens_in_subtree = lefts + [token.text] + rights
-  return " ".join(tokens_in_subtree)
+  """
+  returns the text of the token's subtree, without punct/mark dependents (and their subtrees)
+    or any of the token's direct children listed in exclude
+
+  walks the subtree with an explicit stack, in the same (lefts, token, rights) order
+    as a recursive walk, so deep parses can't hit the recursion limit
+  results for calls without exclude are memoized on the token's Doc,
+    keyed by its length too, so a retokenized Doc doesn't reuse them (see clear_subtree_text_memo)
+  """
+  exclude = {t.i for t in exclude if t is not None}
+  memo = token.doc.user_data.setdefault(("subtree_text", len(token.doc)), dict())
+  if not exclude and token.i in memo:
+    return memo[token.i]
+
+  def included_children(t, children):
+    return [c for c in children\
+            if c.dep_ not in SUBTREE_DEP_TYPES_TO_EXCLUDE\
+              and not (t is token and c.i in exclude)]
+
+  words = list()
+  # stack of (token, expanded) pairs; expanded tokens are emitted as-is
+  stack = [(token, False)]
+  while stack:
+    t, expanded = stack.pop()
+    if expanded:
+      words.append(t.text)
+    elif t is not token and t.i in memo:
+      words.append(memo[t.i])
+    else:
+      stack.extend((c, False) for c in reversed(included_children(t, t.rights)))
+      stack.append((t, True))
+      stack.extend((c, False) for c in reversed(included_children(t, t.lefts)))
+
+  text = " ".join(words)
+  if not exclude:
+    memo[token.i] = text
+  return text
+
+
+def stable_id(*parts) -> int:
+  """
+  returns a deterministic 64-bit integer id derived from the parts' content
+    unlike hash(), this is the same across processes and runs
+  """
+  key = "\x1f".join(str(p) for p in parts)
+  digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+  return int.from_bytes(digest, "big")
+
+
+def clear_subtree_text_memo(doc):
+  """
+  drops get_subtree_text's memoized results, call it after retokenizing or reparsing the Doc
+  """
+  for key in [k for k in doc.user_data if isinstance(k, tuple) and k[0] == "subtree_text"]:
+    del doc.user_data[key]
 
 
 def plot_graph_from_edge_list(
@@ -38,6 +85,7 @@ def plot_graph_from_edge_list(
       G,
       k=k,
     )
+    import matplotlib.pyplot as plt
     plt.figure(figsize=shape, dpi=100)
     nx.draw(
       G,
@@ -87,6 +135,22 @@ def remove_rel_prefix(rel:str, prefix:str):
   return rel.replace(prefix, "")
 
 
+def get_relation_indices(rel_name:str,
+                         prefix:str,
+                         temporal_predicates_map:dict,
+                         temporal_relations_map:dict) -> tuple:
+  """
+  maps a (possibly prefixed) temporal relation name to its (start, end) rel_pos_tags indices
+  """
+  # get the cleaned relation name
+  cleaned_rel_name = remove_rel_prefix(rel_name, prefix)
+  if cleaned_rel_name not in temporal_relations_map:
+    cleaned_rel_name = cleaned_rel_name.split(" ")[-1]
+    cleaned_rel_name = temporal_predicates_map.get(cleaned_rel_name, cleaned_rel_name)
+  # map the relation to indices
+  return temporal_relations_map[cleaned_rel_name]
+
+
 def list_nodes(g, drop_prefix:bool=False):
   if drop_prefix:
     return [node.split(" ")[-1] for node, _ in list(g.nodes(data=True))]
@@ -128,6 +192,8 @@ def print_interval_tree(tree):
 
 
 def plot_interval_tree(tree:IntervalTree, grid:bool=True):
+  import matplotlib.pyplot as plt
+
   # Prepare data
   intervals = sorted(tree)
   fig, ax = plt.subplots()